@@ -0,0 +1,139 @@
+"""
+Сравнение чтения из SQLite: датаклассы (dict -> датакласс -> astuple)
+против потока кортежей с поколоночным преобразованием.
+
+Запуск из каталога app:
+    python -m benchmarks.extract_pipeline --rows 1000000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+import uuid
+from dataclasses import astuple
+
+from load_data import (
+    TABLE_COLUMNS,
+    TABLE_TYPE_TO_TRANSFER,
+    SQLiteExtractor,
+    encode_copy_batch,
+    to_columns,
+)
+
+TABLE = "person_film_work"
+ROLES = ("actor", "director", "writer")
+
+
+def build_source(db_path: str, rows: int) -> None:
+    """Создать SQLite с таблицей person_film_work из rows строк"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            f"CREATE TABLE {TABLE} (id TEXT PRIMARY KEY, film_work_id TEXT, "
+            "person_id TEXT, role TEXT, created_at TIMESTAMP);"
+        )
+        conn.executemany(
+            f"INSERT INTO {TABLE} VALUES (?, ?, ?, ?, ?);",
+            (
+                (
+                    str(uuid.uuid4()),
+                    str(uuid.uuid4()),
+                    str(uuid.uuid4()),
+                    ROLES[i % len(ROLES)],
+                    "2021-06-16 20:14:09.310212+00",
+                )
+                for i in range(rows)
+            ),
+        )
+
+
+def dataclass_path(conn: sqlite3.Connection, batch_size: int) -> int:
+    rows = 0
+    batches = SQLiteExtractor().extract_data_batch(
+        conn, TABLE, TABLE_TYPE_TO_TRANSFER[TABLE], batch_size
+    )
+    for batch in batches:
+        data = [astuple(item) for item in batch]
+        rows += len(data)
+    return rows
+
+
+def tuple_path(conn: sqlite3.Connection, batch_size: int) -> int:
+    rows = 0
+    for _, batch in SQLiteExtractor().extract_rows_after_rowid(conn, TABLE, batch_size):
+        to_columns(batch, TABLE)
+        rows += len(batch)
+    return rows
+
+
+def tuple_copy_path(conn: sqlite3.Connection, batch_size: int) -> int:
+    """Кортежи плюс кодирование для COPY, то есть вся подготовка к записи"""
+    rows = 0
+    for _, batch in SQLiteExtractor().extract_rows_after_rowid(conn, TABLE, batch_size):
+        encode_copy_batch(to_columns(batch, TABLE), TABLE_COLUMNS[TABLE])
+        rows += len(batch)
+    return rows
+
+
+def peak_memory(path, db_path: str, batch_size: int) -> int:
+    """Пик памяти Python-объектов за полный проход по таблице, байт"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        tracemalloc.start()
+        path(conn, batch_size)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        conn.close()
+    return peak
+
+
+def measure(name: str, path, sources: dict, batch_size: int) -> None:
+    """Время на полной таблице и пик памяти на двух размерах.
+
+    Рост пика между размерами показывает, как память зависит от числа
+    строк: при потоковом чтении он близок к нулю, пик определяется батчем.
+    """
+    (small_rows, small_path), (rows, db_path) = sorted(sources.items())
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        started = time.perf_counter()
+        path(conn, batch_size)
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.close()
+
+    small_peak = peak_memory(path, small_path, batch_size)
+    peak = peak_memory(path, db_path, batch_size)
+    growth = (peak - small_peak) / (rows - small_rows) * 1_000_000
+
+    print(
+        f"{name:<16} {elapsed * 1_000_000 / rows:8.2f} с/млн строк  "
+        f"пик {small_peak / 2**20:7.1f} МБ на {small_rows} строк, "
+        f"{peak / 2**20:7.1f} МБ на {rows} строк  "
+        f"(рост {growth / 2**20:+.1f} МБ/млн строк)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = {}
+        for rows in (args.rows // 4, args.rows):
+            sources[rows] = os.path.join(tmp, f"source_{rows}.sqlite")
+            build_source(sources[rows], rows)
+        measure("dataclass", dataclass_path, sources, args.batch_size)
+        measure("tuple", tuple_path, sources, args.batch_size)
+        measure("tuple+copy", tuple_copy_path, sources, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Нагрузочный тест HTTP API: пропускная способность и перцентили задержки
+при заданном числе одновременных клиентов.
+
+Сценарии:
+    login       - POST /api/v1/auth/login, асинхронный вход (запускать под ASGI)
+    admin-login - POST /admin/login/, синхронная форма входа (запускать под WSGI)
+    search, genres - GET /api/v1/search?q=... и /api/v1/genres
+
+Вход делает два запроса к сервису авторизации (используйте с
+benchmarks.slow_auth). Логины перебираются по кругу из --users штук:
+профиль кешируется по логину, и при --users больше числа запросов каждый
+вход идет в /user/me.
+
+Сравнение синхронного входа под uWSGI с асинхронным под uvicorn,
+из каталога app:
+    python -m benchmarks.load_test --scenario admin-login --concurrency 64  # uWSGI
+    python -m benchmarks.load_test --scenario login --concurrency 64        # uvicorn
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+SCENARIOS = ("login", "admin-login", "search", "genres")
+LOGIN_SCENARIOS = ("login", "admin-login")
+
+
+async def prepare_login(client: httpx.AsyncClient) -> None:
+    # Форма входа админки выставляет cookie csrftoken
+    await client.get("/admin/login/")
+
+
+async def request_once(
+    client: httpx.AsyncClient, scenario: str, number: int, users: int
+) -> bool:
+    """Выполнить запрос; True, если он успешен"""
+    credentials = {"username": f"loadtest{number % users}", "password": "loadtest"}
+    csrf_token = client.cookies.get("csrftoken", "")
+    if scenario == "login":
+        response = await client.post(
+            "/api/v1/auth/login", data=credentials, headers={"X-CSRFToken": csrf_token}
+        )
+    elif scenario == "admin-login":
+        response = await client.post(
+            "/admin/login/",
+            data={**credentials, "csrfmiddlewaretoken": csrf_token, "next": "/admin/"},
+        )
+        # Успешный вход - редирект на next; при ошибке форма отдается снова с 200.
+        # Сессию сбрасываем, чтобы следующий вход снова шел в сервис авторизации
+        client.cookies.delete("sessionid")
+        return response.status_code == 302
+    elif scenario == "search":
+        response = await client.get("/api/v1/search", params={"q": "star"})
+    else:
+        response = await client.get("/api/v1/genres")
+    return response.status_code == 200
+
+
+async def worker(url, scenario, users, jobs, latencies, errors):
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        if scenario in LOGIN_SCENARIOS:
+            await prepare_login(client)
+        while True:
+            try:
+                number = jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                ok = await request_once(client, scenario, number, users)
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors.append(number)
+
+
+async def run(url: str, scenario: str, concurrency: int, requests: int, users: int) -> None:
+    jobs = asyncio.Queue()
+    for number in range(requests):
+        jobs.put_nowait(number)
+    latencies, errors = [], []
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            worker(url, scenario, users, jobs, latencies, errors)
+            for _ in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{scenario}: {len(latencies)} запросов за {elapsed:.1f} с, "
+        f"{len(latencies) / elapsed:.1f} запр/с, ошибок {len(errors)}"
+    )
+    print(
+        f"задержка, мс: p50 {quantiles[49] * 1000:.0f}  "
+        f"p90 {quantiles[89] * 1000:.0f}  p99 {quantiles[98] * 1000:.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="login")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--users", type=int, default=1_000_000, help="Число разных логинов для входа"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.url, args.scenario, args.concurrency, args.requests, args.users))
+
+
+if __name__ == "__main__":
+    main()
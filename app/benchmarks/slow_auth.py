@@ -0,0 +1,58 @@
+"""
+Заглушка сервиса авторизации с задержкой ответа - медленный upstream
+для сравнения режимов uWSGI и ASGI.
+
+Запуск из каталога app:
+    python -m benchmarks.slow_auth --port 8081 --delay 0.2
+и AUTH_API=http://127.0.0.1:8081 у приложения.
+"""
+import argparse
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SlowAuthHandler(BaseHTTPRequestHandler):
+    delay = 0.2
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.delay)
+        if self.path == "/api/v1/tokens":
+            # Новый токен на каждый вход, как у настоящего сервиса
+            body = {"access_token": uuid.uuid4().hex}
+        elif self.path == "/api/v1/user/me":
+            body = {
+                "id": "00000000-0000-0000-0000-000000000001",
+                "email": "loadtest@example.com",
+                "login": "loadtest",
+                "first_name": "Load",
+                "last_name": "Test",
+            }
+        else:
+            self.send_error(404)
+            return
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--delay", type=float, default=0.2, help="Задержка ответа, с")
+    args = parser.parse_args()
+
+    SlowAuthHandler.delay = args.delay
+    ThreadingHTTPServer(("0.0.0.0", args.port), SlowAuthHandler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
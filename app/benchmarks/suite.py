@@ -0,0 +1,208 @@
+"""
+Набор бенчмарков: загрузка из SQLite, сериализация фильмов и страницы админки.
+
+Запускается против локального Postgres из .env: создается отдельная тестовая
+БД (test_<DB_NAME>) с миграциями, в нее загружается синтетический каталог
+(benchmarks.synthetic), после прогона БД удаляется. Для каждого бенчмарка
+записываются время, пропускная способность, число SQL-запросов и пиковый RSS.
+
+Из каталога app:
+    python -m benchmarks.suite --films 20000 --save-baseline
+    python -m benchmarks.suite --films 20000     # сравнить с baseline
+Код возврата 1, если есть регрессии относительно baseline.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Допустимое ухудшение времени и памяти относительно baseline
+TOLERANCE = 0.2
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss в КБ на Linux; это пик процесса за все время, поэтому
+    # бенчмарки идут от легких к тяжелым
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def result(seconds, items, queries=None) -> dict:
+    return {
+        "seconds": round(seconds, 4),
+        "per_second": round(items / seconds, 1) if seconds else None,
+        "queries": queries,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def bench_load(db_path: str, dsl: dict, mode: str) -> dict:
+    import psycopg2
+    from psycopg2.extras import DictCursor
+
+    from load_data import TABLE_COLUMNS, conn_context, load_from_sqlite
+
+    with conn_context(db_path) as sqlite_conn:
+        rows = sum(
+            sqlite_conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+            for table in TABLE_COLUMNS
+        )
+        with closing(psycopg2.connect(**dsl, cursor_factory=DictCursor)) as pg_conn:
+            started = time.perf_counter()
+            load_from_sqlite(sqlite_conn, pg_conn, mode=mode)
+            return result(time.perf_counter() - started, rows)
+
+
+def bench_serialize(films: int) -> dict:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from movies.models import Filmwork
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        count = sum(1 for _ in Filmwork.objects.order_by("id")[:films].serialize())
+        elapsed = time.perf_counter() - started
+    return result(elapsed, count, len(queries))
+
+
+def bench_view(client, url: str, repeat: int) -> dict:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url}: HTTP {response.status_code}")
+    # Медиана устойчивее к единичным выбросам; пропускная способность - запросов в секунду
+    return result(statistics.median(timings), 1, len(queries))
+
+
+def run(args) -> dict:
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    from benchmarks.synthetic import Catalogue, write_sqlite
+    from config.db import loader_dsl
+    from movies.models import Filmwork, Person, User
+
+    results = {}
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "source.sqlite")
+            write_sqlite(db_path, Catalogue(films=args.films, seed=args.seed))
+            dsl = {**loader_dsl(), "dbname": connection.settings_dict["NAME"]}
+            results["load_from_sqlite"] = bench_load(db_path, dsl, args.mode)
+
+        results["serialize"] = bench_serialize(args.films)
+
+        user = User.objects.create(
+            username="benchmark", email="benchmark@example.com", is_admin=True
+        )
+        client = Client()
+        client.force_login(user)
+        film = Filmwork.objects.order_by("id").first()
+        person = Person.objects.order_by("id").first()
+        views = {
+            "filmwork_changelist": "/admin/movies/filmwork/",
+            "filmwork_changelist_search": "/admin/movies/filmwork/?q=star",
+            "filmwork_change": f"/admin/movies/filmwork/{film.pk}/change/",
+            "person_changelist": "/admin/movies/person/",
+            "person_changelist_search": "/admin/movies/person/?q=Ivan",
+            "person_change": f"/admin/movies/person/{person.pk}/change/",
+        }
+        for name, url in views.items():
+            results[name] = bench_view(client, url, args.repeat)
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Регрессии: время и память хуже baseline больше чем на tolerance,
+    число SQL-запросов больше, чем в baseline"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in ("seconds", "peak_rss_mb"):
+            if current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}.{metric}: {base[metric]} -> {current[metric]}")
+        if base["queries"] is not None and current["queries"] > base["queries"]:
+            regressions.append(f"{name}.queries: {base['queries']} -> {current['queries']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--films", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", choices=("insert", "copy"), default="copy")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов каждой страницы")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Записать результаты как baseline"
+    )
+    args = parser.parse_args()
+
+    results = run(args)
+    print(f"{'бенчмарк':<28} {'время, с':>10} {'в секунду':>12} {'SQL':>6} {'RSS, МБ':>9}")
+    for name, item in results.items():
+        print(
+            f"{name:<28} {item['seconds']:>10.4f} {item['per_second'] or 0:>12.1f} "
+            f"{item['queries'] if item['queries'] is not None else '-':>6} "
+            f"{item['peak_rss_mb']:>9.1f}"
+        )
+
+    if args.save_baseline:
+        payload = {"films": args.films, "seed": args.seed, "results": results}
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(payload, baseline_file, indent=2)
+        print(f"Baseline записан в {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("Baseline нет, сравнение пропущено (--save-baseline)")
+        return
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if (baseline["films"], baseline["seed"]) != (args.films, args.seed):
+        sys.exit(f"Baseline снят на --films {baseline['films']} --seed {baseline['seed']}")
+    regressions = compare(results, baseline["results"], args.tolerance)
+    for line in regressions:
+        print(f"РЕГРЕССИЯ {line}")
+    if regressions:
+        sys.exit(1)
+    print("Регрессий нет")
+
+
+if __name__ == "__main__":
+    main()
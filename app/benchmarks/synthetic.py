@@ -0,0 +1,223 @@
+"""
+Синтетический каталог: жанры, люди, фильмы и связи между ними.
+
+Строки детерминированы по seed: id вычисляются из номера строки, а случайные
+значения фильма берутся из генератора, засеянного seed и номером порции
+фильмов. Поэтому любую порцию можно построить независимо (в другом процессе)
+и получить тот же результат.
+
+Распределения близки к реальному каталогу: популярность жанров и людей
+подчиняется закону Ципфа (k-й по популярности встречается в ~1/k раз реже
+первого), число людей в фильме - с тяжелым хвостом (Парето), большинство
+ролей - актеры.
+
+Создать SQLite-источник для load_data.py (из каталога app):
+    python -m benchmarks.synthetic db.sqlite --films 100000
+"""
+import argparse
+import datetime
+import random
+import sqlite3
+import uuid
+from dataclasses import dataclass
+from typing import Iterator, Tuple
+
+from load_data import TABLE_COLUMNS
+
+# Номер таблицы входит в id, чтобы id разных таблиц не совпадали
+_KINDS = {
+    "genre": 1,
+    "person": 2,
+    "film_work": 3,
+    "genre_film_work": 4,
+    "person_film_work": 5,
+}
+
+ROLES = ("actor", "director", "writer")
+ROLE_WEIGHTS = (8, 1, 1)
+# Параметр Парето для числа людей в фильме и верхняя граница этого числа
+PERSONS_ALPHA = 2.0
+MAX_PERSONS_PER_FILM = 200
+TYPES = ("movie", "tv_show")
+WORDS = (
+    "star", "war", "night", "love", "city", "dark", "river", "king", "last",
+    "house", "ghost", "summer", "road", "winter", "secret", "island", "storm",
+    "empire", "shadow", "dream", "звезда", "война", "ночь", "город", "река",
+)
+FIRST_NAMES = ("Ivan", "Anna", "John", "Maria", "Peter", "Olga", "James", "Elena")
+LAST_NAMES = ("Petrov", "Smith", "Ivanova", "Brown", "Sidorov", "Miller", "Orlova")
+
+# Порция фильмов с общим генератором случайных чисел
+CHUNK_SIZE = 10_000
+
+FIRST_DATE = datetime.date(1950, 1, 1)
+CREATED_AT = datetime.datetime(2021, 6, 16, 20, 14, 9, tzinfo=datetime.timezone.utc)
+
+
+def make_id(seed: int, table: str, index: int) -> uuid.UUID:
+    return uuid.UUID(int=(seed << 96) | (_KINDS[table] << 64) | index, version=4)
+
+
+def zipf_index(rnd: random.Random, n: int) -> int:
+    """Номер из range(n) с вероятностью ~1/(k+1): (n + 1) ** U при равномерном U
+    распределен логарифмически на [1, n + 1), что и дает закон Ципфа
+    с показателем 1; достижим любой номер, включая n - 1"""
+    return int((n + 1) ** rnd.random()) - 1
+
+
+@dataclass(frozen=True)
+class Catalogue:
+    films: int
+    genres: int = 30
+    persons: int = 0
+    # Средние числа жанров и людей на фильм
+    genres_per_film: int = 2
+    persons_per_film: int = 6
+    seed: int = 0
+
+    def __post_init__(self):
+        if not self.persons:
+            object.__setattr__(self, "persons", max(self.films // 2, 1))
+
+    def _timestamp(self, index: int) -> str:
+        # Растущие updated_at, как у реального каталога, для --incremental
+        return str(CREATED_AT + datetime.timedelta(seconds=index))
+
+    def _words(self, rnd: random.Random, count: int) -> str:
+        return " ".join(rnd.choice(WORDS) for _ in range(count))
+
+    def genre_rows(self) -> Iterator[Tuple]:
+        for index in range(self.genres):
+            created = self._timestamp(index)
+            yield (
+                f"Genre {index}",
+                f"Genre {index} description",
+                created,
+                created,
+                str(make_id(self.seed, "genre", index)),
+            )
+
+    def person_rows(self, start: int = 0, stop: int = None) -> Iterator[Tuple]:
+        stop = self.persons if stop is None else stop
+        for index in range(start, stop):
+            name = (
+                f"{FIRST_NAMES[index % len(FIRST_NAMES)]} "
+                f"{LAST_NAMES[index // len(FIRST_NAMES) % len(LAST_NAMES)]} {index}"
+            )
+            created = self._timestamp(index)
+            yield (name, created, created, str(make_id(self.seed, "person", index)))
+
+    def chunks(self) -> Iterator[Tuple[int, int]]:
+        """Диапазоны номеров фильмов по CHUNK_SIZE"""
+        for start in range(0, self.films, CHUNK_SIZE):
+            yield start, min(start + CHUNK_SIZE, self.films)
+
+    def film_chunk(self, start: int, stop: int) -> dict:
+        """Фильмы [start, stop) и их связи: таблица -> список кортежей.
+
+        start должен быть границей порции из chunks(), иначе строки
+        не совпадут с построенными целиком.
+        """
+        rnd = random.Random(f"{self.seed}:{start}")
+        rows = {"film_work": [], "genre_film_work": [], "person_film_work": []}
+        for index in range(start, stop):
+            film_id = str(make_id(self.seed, "film_work", index))
+            created = self._timestamp(index)
+            rows["film_work"].append(
+                (
+                    self._words(rnd, rnd.randint(1, 4)).capitalize(),
+                    self._words(rnd, rnd.randint(5, 30)),
+                    str(FIRST_DATE + datetime.timedelta(days=rnd.randrange(27_000))),
+                    round(rnd.uniform(1, 10), 1),
+                    rnd.choice(TYPES),
+                    None,
+                    created,
+                    created,
+                    film_id,
+                )
+            )
+            for slot, genre in enumerate(self._genre_choice(rnd)):
+                rows["genre_film_work"].append(
+                    (
+                        str(make_id(self.seed, "genre", genre)),
+                        film_id,
+                        created,
+                        str(self._link_id("genre_film_work", index, slot)),
+                    )
+                )
+            for slot, (person, role) in enumerate(self._person_choice(rnd)):
+                rows["person_film_work"].append(
+                    (
+                        str(make_id(self.seed, "person", person)),
+                        film_id,
+                        created,
+                        role,
+                        str(self._link_id("person_film_work", index, slot)),
+                    )
+                )
+        return rows
+
+    def _link_id(self, table: str, film: int, slot: int) -> uuid.UUID:
+        return make_id(self.seed, table, (film << 16) | slot)
+
+    def _genre_choice(self, rnd: random.Random):
+        # Ровно count попыток: повторы отбрасываются, цикл не зависит
+        # от того, хватает ли жанров
+        count = rnd.randint(1, 2 * self.genres_per_film - 1)
+        return sorted({zipf_index(rnd, self.genres) for _ in range(count)})
+
+    def _person_choice(self, rnd: random.Random):
+        # Среднее Парето с параметром alpha равно alpha / (alpha - 1)
+        scale = self.persons_per_film * (PERSONS_ALPHA - 1) / PERSONS_ALPHA
+        count = min(round(rnd.paretovariate(PERSONS_ALPHA) * scale), MAX_PERSONS_PER_FILM)
+        # (человек, роль) уникальны в пределах фильма; сортировка - чтобы порядок
+        # не зависел от хеширования строк
+        return sorted(
+            {
+                (zipf_index(rnd, self.persons), rnd.choices(ROLES, ROLE_WEIGHTS)[0])
+                for _ in range(max(count, 1))
+            }
+        )
+
+
+def write_sqlite(path: str, catalogue: Catalogue) -> dict:
+    """Записать каталог в SQLite в схеме db.sqlite; вернуть число строк по таблицам"""
+    counts = dict.fromkeys(TABLE_COLUMNS, 0)
+    with sqlite3.connect(path) as conn:
+        for table, columns in TABLE_COLUMNS.items():
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)});")
+
+        def insert(table, rows):
+            rows = list(rows)
+            placeholders = ", ".join("?" * len(TABLE_COLUMNS[table]))
+            conn.executemany(f"INSERT INTO {table} VALUES ({placeholders});", rows)
+            counts[table] += len(rows)
+
+        insert("genre", catalogue.genre_rows())
+        insert("person", catalogue.person_rows())
+        for start, stop in catalogue.chunks():
+            for table, rows in catalogue.film_chunk(start, stop).items():
+                insert(table, rows)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("path")
+    parser.add_argument("--films", type=int, default=10_000)
+    parser.add_argument("--genres", type=int, default=30)
+    parser.add_argument("--persons", type=int, default=0, help="По умолчанию films / 2")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    catalogue = Catalogue(
+        films=args.films, genres=args.genres, persons=args.persons, seed=args.seed
+    )
+    for table, count in write_sqlite(args.path, catalogue).items():
+        print(f"{table}: {count}")
+
+
+if __name__ == "__main__":
+    main()
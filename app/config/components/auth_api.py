@@ -0,0 +1,22 @@
+import os
+
+
+# HTTP-клиент сервиса авторизации (movies.auth_client)
+
+# Таймауты подключения и чтения, в секундах
+AUTH_API_CONNECT_TIMEOUT = float(os.environ.get("AUTH_API_CONNECT_TIMEOUT", 1.0))
+AUTH_API_READ_TIMEOUT = float(os.environ.get("AUTH_API_READ_TIMEOUT", 3.0))
+
+# Число keep-alive соединений в пуле одного процесса
+AUTH_API_POOL_SIZE = int(os.environ.get("AUTH_API_POOL_SIZE", 10))
+
+# Повторы при ошибках соединения и ответах 502/503/504
+AUTH_API_RETRIES = int(os.environ.get("AUTH_API_RETRIES", 2))
+AUTH_API_BACKOFF_FACTOR = float(os.environ.get("AUTH_API_BACKOFF_FACTOR", 0.2))
+
+# Circuit breaker: после стольких ошибок подряд запросы не отправляются
+# в течение AUTH_API_BREAKER_RESET_TIMEOUT секунд
+AUTH_API_BREAKER_THRESHOLD = int(os.environ.get("AUTH_API_BREAKER_THRESHOLD", 5))
+AUTH_API_BREAKER_RESET_TIMEOUT = float(
+    os.environ.get("AUTH_API_BREAKER_RESET_TIMEOUT", 30)
+)
@@ -0,0 +1,41 @@
+import os
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+# Общий кеш для всех воркеров (Redis или совместимый сервер).
+# Без REDIS_URL используется только локальный кеш процесса.
+REDIS_URL = os.environ.get("REDIS_URL")
+
+CACHE_TIMEOUT = int(os.environ.get("CACHE_TIMEOUT", 300))
+
+# Локальный LRU-уровень перед общим кешем: сколько секунд процесс может
+# отдавать значение, не спрашивая общий кеш, и сколько ключей хранит
+CACHE_LOCAL_TIMEOUT = int(os.environ.get("CACHE_LOCAL_TIMEOUT", 5))
+CACHE_LOCAL_MAX_ENTRIES = int(os.environ.get("CACHE_LOCAL_MAX_ENTRIES", 1000))
+
+LOCAL_CACHE = {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "local",
+    "OPTIONS": {"MAX_ENTRIES": CACHE_LOCAL_MAX_ENTRIES},
+}
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "movies.cache_backends.TieredCache",
+            "TIMEOUT": CACHE_TIMEOUT,
+            "OPTIONS": {"SHARED": "shared", "LOCAL": "local"},
+        },
+        "shared": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "TIMEOUT": CACHE_TIMEOUT,
+        },
+        "local": {**LOCAL_CACHE, "TIMEOUT": CACHE_LOCAL_TIMEOUT},
+    }
+else:
+    CACHES = {
+        "default": {**LOCAL_CACHE, "TIMEOUT": CACHE_TIMEOUT},
+    }
@@ -0,0 +1,10 @@
+import os
+
+
+# Лента изменений и выгрузка по водяному знаку (movies.models.change_feed_until)
+
+# На сколько секунд верхняя граница выборки отстает от текущего времени.
+# updated_at выставляется при save(), а видна строка только после коммита:
+# строка из транзакции, которая еще идет, не должна оказаться раньше
+# уже выданного водяного знака. Значение - больше самой долгой транзакции записи
+CHANGE_FEED_LAG = int(os.environ.get("CHANGE_FEED_LAG", 10))
@@ -1,9 +1,32 @@
 import os
 
+import django
+from django.core.exceptions import ImproperlyConfigured
+
+from config.db import connect_timeout, server_options
+
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Сколько секунд воркер держит соединение открытым между запросами;
+# 0 - новое соединение на каждый запрос.
+# Под ASGI синхронный код выполняется в разных потоках, у каждого потока свое
+# соединение, и постоянные соединения не переиспользуются, а копятся
+# (Django #33497): там CONN_MAX_AGE всегда 0, переиспользование - через DB_POOL
+DB_CONN_MAX_AGE = (
+    0
+    if os.environ.get("SERVER_MODE") == "asgi"
+    else int(os.environ.get("DB_CONN_MAX_AGE", 60))
+)
+
+# Пул psycopg 3 (Django 5.1+) вместо постоянных соединений:
+# DB_POOL=1, размеры пула и ожидание свободного соединения в секундах
+DB_POOL = os.environ.get("DB_POOL", "0") == "1"
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", 8))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -11,6 +34,26 @@ DATABASES = {
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
-        'PORT': os.environ.get('DB_PORT')
+        'PORT': os.environ.get('DB_PORT'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        # Проверять переиспользуемое соединение перед первым запросом,
+        # чтобы не отдавать ошибку после рестарта Postgres
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': connect_timeout(),
+            'application_name': 'admin-service',
+            'options': server_options(),
+        },
     }
 }
+
+if DB_POOL:
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured("DB_POOL requires Django 5.1+ and psycopg[pool]")
+    # Пул сам переиспользует соединения, CONN_MAX_AGE с ним несовместим
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': DB_POOL_MIN_SIZE,
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': DB_POOL_TIMEOUT,
+    }
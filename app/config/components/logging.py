@@ -0,0 +1,8 @@
+from config.log import logging_config
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.0/topics/logging/
+
+# JSON в stdout через фоновый поток; уровни и сэмплирование - LOG_* в config/log.py
+LOGGING = logging_config()
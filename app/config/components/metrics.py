@@ -0,0 +1,8 @@
+import os
+
+
+# Метрики запросов (movies.middleware.RequestMetricsMiddleware)
+
+# Запросы, сделавшие больше SQL-запросов, считаются в
+# http_request_query_budget_exceeded_total и попадают в лог
+REQUEST_QUERY_BUDGET = int(os.environ.get("REQUEST_QUERY_BUDGET", 50))
@@ -31,3 +31,8 @@ AUTH_PASSWORD_VALIDATORS = [
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
 ]
+
+# Токен служебных маршрутов (/metrics, /api/v1/health/db, выгрузка и лента
+# изменений): если задан, запрос должен нести Authorization: Bearer <токен>.
+# Снаружи эти маршруты закрывает nginx (INTERNAL_NETWORKS)
+INTERNAL_API_TOKEN = os.environ.get("INTERNAL_API_TOKEN", "")
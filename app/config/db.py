@@ -0,0 +1,65 @@
+"""
+Параметры подключения к Postgres, общие для Django и загрузчиков.
+
+Модуль не зависит от Django: его импортирует и app/load_data.py,
+который запускается отдельным скриптом. Переменные окружения читаются
+при вызове, то есть уже после load_dotenv().
+
+Переменные:
+    DB_STATEMENT_TIMEOUT - лимит на запрос, мс (0 - без лимита)
+    DB_LOADER_STATEMENT_TIMEOUT - то же для загрузчиков; COPY и
+        построение индексов идут дольше любого запроса админки
+    DB_MIGRATE_STATEMENT_TIMEOUT - то же для manage.py migrate: перестройка
+        таблиц, GIN-индексы и заполнение модели чтения на большом каталоге
+    DB_IDLE_IN_TRANSACTION_TIMEOUT - сколько мс сессия может простаивать
+        внутри транзакции
+    DB_CONNECT_TIMEOUT - таймаут установки соединения, с
+"""
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def connect_timeout() -> int:
+    return _env_int("DB_CONNECT_TIMEOUT", 5)
+
+
+def server_options(statement_timeout: int = None) -> str:
+    """Строка options для libpq: настройки сессии, выставляемые при подключении"""
+    if statement_timeout is None:
+        statement_timeout = _env_int("DB_STATEMENT_TIMEOUT", 30_000)
+    idle_timeout = _env_int("DB_IDLE_IN_TRANSACTION_TIMEOUT", 60_000)
+    return (
+        f"-c statement_timeout={statement_timeout} "
+        f"-c idle_in_transaction_session_timeout={idle_timeout}"
+    )
+
+
+def postgres_dsl(
+    application_name: str = "admin-service", statement_timeout: int = None
+) -> dict:
+    """Параметры psycopg2.connect из переменных окружения DB_*"""
+    return {
+        "dbname": os.environ.get("DB_NAME"),
+        "user": os.environ.get("DB_USER"),
+        "password": os.environ.get("DB_PASSWORD"),
+        "host": os.environ.get("DB_HOST"),
+        "port": _env_int("DB_PORT", 5432),
+        "connect_timeout": connect_timeout(),
+        "application_name": application_name,
+        "options": server_options(statement_timeout),
+    }
+
+
+def migrate_statement_timeout() -> int:
+    return _env_int("DB_MIGRATE_STATEMENT_TIMEOUT", 0)
+
+
+def loader_dsl() -> dict:
+    """Параметры подключения для загрузчиков данных"""
+    return postgres_dsl(
+        application_name="admin-service-loader",
+        statement_timeout=_env_int("DB_LOADER_STATEMENT_TIMEOUT", 0),
+    )
@@ -0,0 +1,202 @@
+"""
+Настройка логирования, общая для Django (LOGGING) и загрузчиков.
+
+Записи пишутся в stdout одной JSON-строкой. Вызов логгера только кладет
+запись в очередь, форматирует и пишет ее фоновый поток, поэтому вывод
+не задерживает обработку запроса.
+
+Переменные:
+    LOG_LEVEL - уровень по умолчанию (INFO)
+    LOG_LEVELS - уровни отдельных логгеров: "movies.auth=DEBUG,django.db.backends=DEBUG"
+    LOG_SAMPLE_RATES - доля записей ниже ERROR, которые попадают в лог:
+        "movies.middleware=0.1"; в записи сохраняется sample_rate
+    LOG_QUEUE_SIZE - длина очереди фонового потока (10000); при переполнении
+        новые записи отбрасываются, их число попадает в лог предупреждением
+"""
+import atexit
+import copy
+import datetime
+import json
+import logging
+import logging.config
+import os
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+# Атрибуты LogRecord; все остальные пришли из extra= и попадают в JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message",
+    "asctime",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        item = {
+            "time": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS:
+                item[name] = value
+        if record.exc_info:
+            item["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            item["exc"] = record.exc_text
+        return json.dumps(item, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает долю rate записей ниже ERROR от указанных логгеров"""
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = rates or {}
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1:
+            return True
+        record.sample_rate = rate
+        return random.random() < rate
+
+    def _rate(self, name):
+        # Ближайший настроенный предок: movies.auth для movies.auth.client
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Очередь ограничена: ждем места, а не теряем сигнал остановки
+        self.queue.put(self._sentinel)
+
+
+class BackgroundHandler(QueueHandler):
+    """QueueHandler со своим фоновым потоком записи в stream.
+
+    Потоки fork не переживают, а uWSGI без lazy-apps настраивает логирование
+    в мастере и без py-call-osafterfork не вызывает обработчики
+    os.register_at_fork. Поэтому поток запускается заново при первой записи
+    в процессе с другим pid. Очередь ограничена maxsize: если поток не
+    успевает писать, новые записи отбрасываются, а не копятся в памяти.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.target = logging.StreamHandler(stream)
+        self.maxsize = maxsize
+        self.listener = None
+        self.dropped = 0
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._start()
+        atexit.register(self._stop)
+
+    def _start(self):
+        self.queue = queue.Queue(self.maxsize)
+        self.listener = _Listener(self.queue, self.target)
+        self.listener.start()
+        self.dropped = 0
+        self._pid = os.getpid()
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            with self._start_lock:
+                if self._pid != os.getpid():
+                    self._start()
+        try:
+            if self.dropped:
+                self.queue.put_nowait(self._dropped_record())
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _dropped_record(self):
+        record = logging.LogRecord(
+            __name__,
+            logging.WARNING,
+            __file__,
+            0,
+            "Очередь лога переполнена, отброшено записей: %d",
+            (self.dropped,),
+            None,
+        )
+        record.dropped = self.dropped
+        return self.prepare(record)
+
+    def _stop(self):
+        # Дописать оставшиеся в очереди записи при выходе; поток,
+        # унаследованный от родителя при fork, в этом процессе не работает
+        if self._pid != os.getpid():
+            return
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+
+    def setFormatter(self, fmt):
+        # Форматирование - в фоновом потоке
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Аргументы сообщения могут измениться после возврата из вызова
+        # логгера, поэтому текст собирается сразу, а JSON - уже в фоне
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _parse_pairs(value, convert):
+    pairs = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, setting = item.partition("=")
+        pairs[name.strip()] = convert(setting.strip())
+    return pairs
+
+
+def logging_config() -> dict:
+    """Конфигурация для logging.config.dictConfig из переменных окружения"""
+    levels = _parse_pairs(os.environ.get("LOG_LEVELS", ""), str.upper)
+    rates = _parse_pairs(
+        os.environ.get("LOG_SAMPLE_RATES", "movies.middleware=0.1"), float
+    )
+    return {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {"json": {"()": JsonFormatter}},
+        "filters": {"sampling": {"()": SamplingFilter, "rates": rates}},
+        "handlers": {
+            "background": {
+                "()": BackgroundHandler,
+                "stream": "ext://sys.stdout",
+                "maxsize": int(os.environ.get("LOG_QUEUE_SIZE", "10000")),
+                "formatter": "json",
+                "filters": ["sampling"],
+            },
+        },
+        "root": {
+            "handlers": ["background"],
+            "level": os.environ.get("LOG_LEVEL", "INFO").upper(),
+        },
+        "loggers": {name: {"level": level} for name, level in levels.items()},
+    }
+
+
+def configure_logging() -> None:
+    """Применить logging_config() вне Django (скрипт load_data.py)"""
+    logging.config.dictConfig(logging_config())
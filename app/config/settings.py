@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.0/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
+import os
 from pathlib import Path
 from dotenv import load_dotenv
 from split_settings.tools import include
@@ -32,10 +33,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'movies.apps.MoviesConfig',
 ]
 
 MIDDLEWARE = [
+    'movies.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,6 +68,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Сервер приложения из scripts/run.sh: "wsgi" (uWSGI) или "asgi" (uvicorn)
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi")
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.0/howto/static-files/
 
@@ -87,7 +93,9 @@ AUTHENTICATION_BACKENDS = [
     # 'django.contrib.auth.backends.ModelBackend',
 ]
 
-AUTH_API = "http://auth-clusterip:8000"
+AUTH_API = os.environ.get("AUTH_API", "http://auth-clusterip:8000")
 #AUTH_API = "http://auth.moviepoisk.ru"
 AUTH_API_LOGIN_URL = f"{AUTH_API}/api/v1/tokens"
 AUTH_API_ME_URL = f"{AUTH_API}/api/v1/user/me"
+# Сколько секунд хранить профиль /user/me в кеше
+AUTH_PROFILE_CACHE_TTL = 60
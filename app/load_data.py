@@ -1,18 +1,31 @@
+import argparse
 import datetime
+import io
+import logging
+import queue
 import sqlite3
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import psycopg2
 from psycopg2.extensions import connection as _connection
 from psycopg2.extras import DictCursor
 from contextlib import contextmanager
-from dataclasses import astuple, dataclass, field, fields
-from typing import List, Type
+from dataclasses import dataclass, field, fields
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type
 
-import os
 from dotenv import load_dotenv
 
-from contextlib import closing
+from contextlib import closing, nullcontext
+
+from config.db import loader_dsl
+from config.log import configure_logging
+from movies import read_model
+
+# Имя фиксировано: при запуске скриптом __name__ == "__main__"
+logger = logging.getLogger("load_data")
 
 
 @contextmanager
@@ -71,27 +84,68 @@ class PersonFilmwork:
     id: uuid.UUID = field(default_factory=uuid.uuid4)
 
 
+TABLE_TYPE_TO_TRANSFER = {
+    "genre": Genre,
+    "person": Person,
+    "film_work": Filmwork,
+    "genre_film_work": GenreFilmwork,
+    "person_film_work": PersonFilmwork,
+}
+
+# Явные списки колонок: из SQLite читаются именно они, в этом же порядке
+TABLE_COLUMNS = {
+    table: tuple(field.name for field in fields(obj_type))
+    for table, obj_type in TABLE_TYPE_TO_TRANSFER.items()
+}
+
+# Колонки со свободным текстом, которые нужно экранировать для COPY
+TEXT_COLUMNS = {"name", "description", "title", "file_path", "full_name", "role"}
+
+
 class PostgresSaver:
-    def save_all(self, connection, items, table_name) -> None:
-        """Сохранить все"""
-        # Получаем названия колонок таблицы (полей датакласса)
-        column_names = [field.name for field in fields(items[0])]  # id, name
+    def save_all(self, connection, batch, table_name, upsert: bool = False) -> None:
+        """Сохранить все (batch - список колонок, см. to_columns)"""
+        column_names = TABLE_COLUMNS[table_name]
         names_string = ", ".join(column_names)
         # В зависимости от количества колонок генерируем под них %s.
         col_count = ", ".join(["%s"] * len(column_names))  # '%s, %s
         with connection.cursor() as cursor:
-            data = list(astuple(row) for row in items)
             args = ",".join(
-                cursor.mogrify(f"({col_count})", item).decode("utf-8") for item in data
+                cursor.mogrify(f"({col_count})", item).decode("utf-8")
+                for item in zip(*batch)
             )
             query = (
                 f"INSERT INTO content.{table_name} ({names_string}) "
                 f"VALUES {args} "
-                f" ON CONFLICT (id) DO NOTHING"
+                f"{_conflict_clause(column_names, upsert)}"
             )
             cursor.execute(query)
             connection.commit()
 
+    def copy_all(self, connection, batch, table_name, upsert: bool = False) -> None:
+        """Сохранить все через COPY во временную таблицу"""
+        column_names = TABLE_COLUMNS[table_name]
+        names_string = ", ".join(column_names)
+        staging_table = f"staging_{table_name}"
+        buffer = io.StringIO(encode_copy_batch(batch, column_names))
+
+        with connection.cursor() as cursor:
+            # Временная таблица живет до конца транзакции, поэтому
+            # повторная загрузка остается идемпотентной за счет ON CONFLICT
+            cursor.execute(
+                f"CREATE TEMP TABLE {staging_table} "
+                f"(LIKE content.{table_name} INCLUDING DEFAULTS) ON COMMIT DROP;"
+            )
+            cursor.copy_expert(
+                f"COPY {staging_table} ({names_string}) FROM STDIN", buffer
+            )
+            cursor.execute(
+                f"INSERT INTO content.{table_name} ({names_string}) "
+                f"SELECT {names_string} FROM {staging_table} "
+                f"{_conflict_clause(column_names, upsert)}"
+            )
+            connection.commit()
+
     def extract_data(self, connection, table_name: str, obj_type: Type) -> List:
         with connection.cursor() as curs:
             curs.execute(f"SELECT * FROM content.{table_name};")
@@ -105,6 +159,356 @@ class PostgresSaver:
             count = cursor.fetchone()[0]
             return count
 
+    def truncate_tables(self, connection, tables: Iterable[str]) -> None:
+        """Очистить таблицы одним TRUNCATE в одной транзакции.
+
+        Таблицы связей, ссылающиеся на очищаемые, добавляются в список сами,
+        контрольные точки загрузки по ним сбрасываются в той же транзакции.
+        Модель чтения приводится к очищенным таблицам там же.
+        """
+        tables = with_dependents(tables)
+        names = ", ".join(f"content.{table}" for table in tables)
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE TABLE {names};")
+            if read_model.exists(cursor):
+                read_model.truncate(cursor, tables)
+            cursor.execute("SELECT to_regclass('content.load_checkpoint');")
+            if cursor.fetchone()[0] is not None:
+                cursor.execute(
+                    "DELETE FROM content.load_checkpoint WHERE table_name = ANY(%s);",
+                    (tables,),
+                )
+            connection.commit()
+
+    def analyze(self, connection, tables: Iterable[str]) -> None:
+        """Обновить статистику планировщика после массовой загрузки"""
+        names = ", ".join(f"content.{table}" for table in tables)
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {names};")
+            connection.commit()
+
+
+class SecondaryIndexes:
+    """Удаление вторичных индексов перед массовой загрузкой и их пересоздание.
+
+    Определения удаленных индексов сохраняются в content.load_dropped_index
+    в той же транзакции, что и DROP INDEX, поэтому после падения загрузки
+    rebuild все равно восстановит их.
+    """
+
+    def _ensure(self, cursor) -> None:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS content.load_dropped_index (
+                index_name TEXT PRIMARY KEY,
+                table_name TEXT NOT NULL,
+                definition TEXT NOT NULL
+            );
+            """
+        )
+
+    def drop(self, connection, tables: Iterable[str]) -> List[str]:
+        """Удалить индексы таблиц, кроме первичных ключей и ограничений"""
+        with connection.cursor() as cursor:
+            self._ensure(cursor)
+            cursor.execute(
+                """
+                SELECT index_class.relname, table_class.relname,
+                       pg_get_indexdef(pg_index.indexrelid)
+                FROM pg_index
+                JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+                JOIN pg_class table_class ON table_class.oid = pg_index.indrelid
+                JOIN pg_namespace ON pg_namespace.oid = table_class.relnamespace
+                WHERE pg_namespace.nspname = 'content'
+                  AND table_class.relname = ANY(%s)
+                  AND NOT pg_index.indisprimary
+                  AND NOT EXISTS (
+                      SELECT 1 FROM pg_constraint
+                      WHERE pg_constraint.conindid = pg_index.indexrelid
+                  );
+                """,
+                (list(tables),),
+            )
+            indexes = cursor.fetchall()
+            for index_name, table_name, definition in indexes:
+                cursor.execute(
+                    "INSERT INTO content.load_dropped_index "
+                    "(index_name, table_name, definition) VALUES (%s, %s, %s) "
+                    "ON CONFLICT (index_name) DO NOTHING;",
+                    (index_name, table_name, definition),
+                )
+                cursor.execute(f'DROP INDEX content."{index_name}";')
+            connection.commit()
+        return [index_name for index_name, _, _ in indexes]
+
+    def rebuild(self, connection, concurrently: bool = False) -> List[str]:
+        """Создать заново все индексы, удаленные drop.
+
+        С concurrently=True индексы строятся через CREATE INDEX CONCURRENTLY,
+        не блокируя запись в таблицы; такой запрос нельзя выполнять
+        в транзакции, поэтому соединение переводится в autocommit.
+        """
+        with connection.cursor() as cursor:
+            self._ensure(cursor)
+            connection.commit()
+            cursor.execute(
+                "SELECT index_name, definition FROM content.load_dropped_index;"
+            )
+            indexes = cursor.fetchall()
+            connection.commit()
+
+        autocommit = connection.autocommit
+        connection.autocommit = concurrently
+        try:
+            with connection.cursor() as cursor:
+                for index_name, definition in indexes:
+                    if concurrently:
+                        definition = definition.replace(
+                            " INDEX ", " INDEX CONCURRENTLY ", 1
+                        )
+                    cursor.execute(definition)
+                    cursor.execute(
+                        "DELETE FROM content.load_dropped_index "
+                        "WHERE index_name = %s;",
+                        (index_name,),
+                    )
+                    if not concurrently:
+                        connection.commit()
+        finally:
+            connection.autocommit = autocommit
+        return [index_name for index_name, _ in indexes]
+
+
+class ForeignKeys:
+    """Отключение проверок внешних ключей на время массовой загрузки.
+
+    Ограничения удаляются, а их определения сохраняются в
+    content.load_dropped_constraint. При восстановлении ограничение
+    добавляется как NOT VALID и затем проверяется VALIDATE CONSTRAINT,
+    который не блокирует запись в таблицу.
+    """
+
+    def _ensure(self, cursor) -> None:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS content.load_dropped_constraint (
+                constraint_name TEXT PRIMARY KEY,
+                table_name TEXT NOT NULL,
+                definition TEXT NOT NULL
+            );
+            """
+        )
+
+    def drop(self, connection, tables: Iterable[str]) -> List[str]:
+        with connection.cursor() as cursor:
+            self._ensure(cursor)
+            cursor.execute(
+                """
+                SELECT pg_constraint.conname, pg_class.relname,
+                       pg_get_constraintdef(pg_constraint.oid)
+                FROM pg_constraint
+                JOIN pg_class ON pg_class.oid = pg_constraint.conrelid
+                JOIN pg_namespace ON pg_namespace.oid = pg_class.relnamespace
+                WHERE pg_namespace.nspname = 'content'
+                  AND pg_constraint.contype = 'f'
+                  AND pg_class.relname = ANY(%s);
+                """,
+                (list(tables),),
+            )
+            constraints = cursor.fetchall()
+            for constraint_name, table_name, definition in constraints:
+                cursor.execute(
+                    "INSERT INTO content.load_dropped_constraint "
+                    "(constraint_name, table_name, definition) VALUES (%s, %s, %s) "
+                    "ON CONFLICT (constraint_name) DO NOTHING;",
+                    (constraint_name, table_name, definition),
+                )
+                cursor.execute(
+                    f'ALTER TABLE content.{table_name} '
+                    f'DROP CONSTRAINT "{constraint_name}";'
+                )
+            connection.commit()
+        return [constraint_name for constraint_name, _, _ in constraints]
+
+    def restore(self, connection) -> List[str]:
+        with connection.cursor() as cursor:
+            self._ensure(cursor)
+            cursor.execute(
+                "SELECT constraint_name, table_name, definition "
+                "FROM content.load_dropped_constraint;"
+            )
+            constraints = cursor.fetchall()
+            for constraint_name, table_name, definition in constraints:
+                cursor.execute(
+                    f'ALTER TABLE content.{table_name} '
+                    f'ADD CONSTRAINT "{constraint_name}" {definition} NOT VALID;'
+                )
+                cursor.execute(
+                    "DELETE FROM content.load_dropped_constraint "
+                    "WHERE constraint_name = %s;",
+                    (constraint_name,),
+                )
+                connection.commit()
+            for constraint_name, table_name, _ in constraints:
+                cursor.execute(
+                    f'ALTER TABLE content.{table_name} '
+                    f'VALIDATE CONSTRAINT "{constraint_name}";'
+                )
+                connection.commit()
+        return [constraint_name for constraint_name, _, _ in constraints]
+
+
+@contextmanager
+def bulk_load_mode(
+    dsl: dict,
+    tables: Iterable[str] = TABLE_TYPE_TO_TRANSFER,
+    concurrently: bool = False,
+):
+    """Массовая загрузка без вторичных индексов и внешних ключей.
+
+    После загрузки (в том числе неудачной) индексы и ограничения
+    восстанавливаются, по таблицам выполняется ANALYZE, а модель чтения
+    пересчитывается целиком: загрузчик в этом режиме ее не обновляет.
+    """
+    tables = list(tables)
+    indexes = SecondaryIndexes()
+    foreign_keys = ForeignKeys()
+    with closing(psycopg2.connect(**dsl)) as pg_conn:
+        dropped = foreign_keys.drop(pg_conn, tables)
+        logger.info("Отключены внешние ключи: %s", ", ".join(dropped) or "-")
+        dropped = indexes.drop(pg_conn, tables)
+        logger.info("Удалены индексы: %s", ", ".join(dropped) or "-")
+    try:
+        yield
+    finally:
+        with closing(psycopg2.connect(**dsl)) as pg_conn:
+            rebuilt = indexes.rebuild(pg_conn, concurrently=concurrently)
+            logger.info("Пересозданы индексы: %s", ", ".join(rebuilt) or "-")
+            restored = foreign_keys.restore(pg_conn)
+            logger.info("Восстановлены внешние ключи: %s", ", ".join(restored) or "-")
+            PostgresSaver().analyze(pg_conn, tables)
+            logger.info("ANALYZE: %s", ", ".join(tables))
+            with pg_conn.cursor() as cursor:
+                has_read_model = read_model.exists(cursor)
+            if has_read_model:
+                rows = read_model.rebuild(pg_conn)
+                logger.info("Модель чтения пересчитана: %s строк", rows)
+
+
+def _conflict_clause(column_names: Tuple[str, ...], upsert: bool) -> str:
+    """ON CONFLICT: пропуск дублей или обновление измененных строк"""
+    if not upsert:
+        # Без цели конфликта пропускаются дубли по любому уникальному ключу:
+        # по id и по составным ключам таблиц связей (film_work, genre)
+        # и (film_work, person, role), даже если id у дубля другой
+        return "ON CONFLICT DO NOTHING"
+    updates = ", ".join(
+        f"{name} = EXCLUDED.{name}" for name in column_names if name != "id"
+    )
+    return f"ON CONFLICT (id) DO UPDATE SET {updates}"
+
+
+class CheckpointStore:
+    """Контрольные точки переноса, хранятся в Postgres рядом с данными.
+
+    kind="rowid" - последний перенесенный rowid для диапазона таблицы,
+    kind="updated_at" - водяной знак (updated_at, rowid) инкрементальной синхронизации.
+    """
+
+    def ensure(self, connection) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS content.load_checkpoint (
+                    table_name TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    range_start BIGINT NOT NULL DEFAULT 0,
+                    last_rowid BIGINT NOT NULL DEFAULT 0,
+                    last_updated_at TEXT,
+                    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+                    PRIMARY KEY (table_name, kind, range_start)
+                );
+                """
+            )
+            connection.commit()
+
+    def get(
+        self, connection, table_name: str, kind: str, range_start: int = 0
+    ) -> Tuple[int, Optional[str]]:
+        """Вернуть (last_rowid, last_updated_at) или (0, None)"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT last_rowid, last_updated_at FROM content.load_checkpoint "
+                "WHERE table_name = %s AND kind = %s AND range_start = %s;",
+                (table_name, kind, range_start),
+            )
+            row = cursor.fetchone()
+            return (row[0], row[1]) if row else (0, None)
+
+    def range_starts(self, connection, table_name: str) -> List[int]:
+        """Начала диапазонов rowid, по которым таблица уже переносилась"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT range_start FROM content.load_checkpoint "
+                "WHERE table_name = %s AND kind = 'rowid' ORDER BY range_start;",
+                (table_name,),
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def save(
+        self,
+        connection,
+        table_name: str,
+        kind: str,
+        range_start: int,
+        last_rowid: int,
+        last_updated_at: Optional[str] = None,
+    ) -> None:
+        """Записать контрольную точку без commit: он делается вместе с батчем"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO content.load_checkpoint "
+                "(table_name, kind, range_start, last_rowid, last_updated_at) "
+                "VALUES (%s, %s, %s, %s, %s) "
+                "ON CONFLICT (table_name, kind, range_start) DO UPDATE SET "
+                "last_rowid = EXCLUDED.last_rowid, "
+                "last_updated_at = EXCLUDED.last_updated_at, "
+                "updated_at = now();",
+                (table_name, kind, range_start, last_rowid, last_updated_at),
+            )
+
+
+def _copy_plain(value) -> str:
+    """Значение без спецсимволов (uuid, даты, числа) в текстовом формате COPY"""
+    return "\\N" if value is None else str(value)
+
+
+def _copy_text(value) -> str:
+    """Текстовое значение в формате COPY с экранированием"""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def to_columns(rows: List[tuple], table_name: str) -> List[tuple]:
+    """Транспонировать батч строк в колонки, отбросив служебный rowid в конце"""
+    return list(zip(*rows))[: len(TABLE_COLUMNS[table_name])]
+
+
+def encode_copy_batch(batch: List[tuple], column_names: Tuple[str, ...]) -> str:
+    """Закодировать батч для COPY: преобразование делается поколоночно"""
+    encoded = [
+        map(_copy_text if name in TEXT_COLUMNS else _copy_plain, column)
+        for name, column in zip(column_names, batch)
+    ]
+    return "".join("\t".join(row) + "\n" for row in zip(*encoded))
+
 
 class SQLiteExtractor:
     def extract_data_batch(
@@ -122,6 +526,60 @@ class SQLiteExtractor:
                 break
             yield [obj_type(**dict(item)) for item in batch]
 
+    def extract_rows_after_rowid(
+        self,
+        connection: sqlite3.Connection,
+        table_name: str,
+        batch_size: int,
+        after_rowid: int = 0,
+        upto_rowid: Optional[int] = None,
+    ):
+        """Батчи кортежей с rowid больше контрольной точки: (последний rowid, батч).
+
+        Строки не превращаются в dict/датаклассы: каждый кортеж - колонки
+        TABLE_COLUMNS[table_name] и rowid последним элементом.
+        """
+        names_string = ", ".join(TABLE_COLUMNS[table_name])
+        query = f"SELECT {names_string}, rowid FROM {table_name} WHERE rowid > ?"
+        params = [after_rowid]
+        if upto_rowid is not None:
+            query += " AND rowid <= ?"
+            params.append(upto_rowid)
+        curs = connection.cursor()
+        curs.row_factory = None
+        curs.execute(f"{query} ORDER BY rowid;", params)
+        while True:
+            batch = curs.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch[-1][-1], batch
+
+    def extract_changed_rows(
+        self,
+        connection: sqlite3.Connection,
+        table_name: str,
+        batch_size: int,
+        after_updated_at: Optional[str] = None,
+        after_rowid: int = 0,
+    ):
+        """Батчи кортежей, измененных после водяного знака (updated_at, rowid)"""
+        column_names = TABLE_COLUMNS[table_name]
+        updated_at_index = column_names.index("updated_at")
+        query = f"SELECT {', '.join(column_names)}, rowid FROM {table_name}"
+        params = []
+        if after_updated_at is not None:
+            query += " WHERE (updated_at, rowid) > (?, ?)"
+            params = [after_updated_at, after_rowid]
+        curs = connection.cursor()
+        curs.row_factory = None
+        curs.execute(f"{query} ORDER BY updated_at, rowid;", params)
+        while True:
+            batch = curs.fetchmany(batch_size)
+            if not batch:
+                break
+            last = batch[-1]
+            yield (last[updated_at_index], last[-1]), batch
+
     def extract_data(
         self, connection: sqlite3.Connection, table_name: str, obj_type: Type
     ) -> List:
@@ -130,56 +588,531 @@ class SQLiteExtractor:
         data = curs.fetchall()
         return [obj_type(**dict(item)) for item in data]
 
+    def split_rowid_ranges(
+        self, connection: sqlite3.Connection, table_name: str, parts: int
+    ) -> List[Tuple[int, int]]:
+        """Разбить таблицу на диапазоны rowid примерно одинакового размера"""
+        curs = connection.cursor()
+        curs.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {table_name};")
+        low, high = curs.fetchone()
+        if low is None:
+            return []
+        step = -(-(high - low + 1) // max(parts, 1))
+        return [
+            (start, min(start + step - 1, high)) for start in range(low, high + 1, step)
+        ]
+
+
+# Способы записи в Postgres: многострочный INSERT или COPY через staging-таблицу
+WRITER_MODES = {
+    "insert": "save_all",
+    "copy": "copy_all",
+}
+
+
+# Независимые таблицы можно грузить параллельно, таблицы связей - только после них
+PARENT_TABLES = ("genre", "person", "film_work")
+LINK_TABLES = ("genre_film_work", "person_film_work")
+
+# Таблицы связей, которые ссылаются на таблицу по внешнему ключу
+TABLE_DEPENDENTS = {
+    "genre": ("genre_film_work",),
+    "person": ("person_film_work",),
+    "film_work": ("genre_film_work", "person_film_work"),
+}
+
+
+def with_dependents(tables: Iterable[str]) -> List[str]:
+    """Таблицы вместе с зависимыми, в порядке TABLE_TYPE_TO_TRANSFER"""
+    selected = set(tables)
+    for table in list(selected):
+        selected.update(TABLE_DEPENDENTS.get(table, ()))
+    return [table for table in TABLE_TYPE_TO_TRANSFER if table in selected]
+
+
+_DONE = object()
+
+
+class BatchPipeline:
+    """Чтение, преобразование и запись батчей в отдельных потоках.
+
+    Этапы связаны очередями ограниченной длины: если запись отстает,
+    чтение блокируется, и в памяти остается не больше queue_depth батчей
+    на каждую очередь. Чтение идет в вызывающем потоке, потому что
+    соединение SQLite привязано к потоку, в котором создано.
+    """
 
-def load_from_sqlite(connection: sqlite3.Connection, pg_conn: _connection):
-    """Основной метод загрузки данных из SQLite в Postgres"""
-    print("Начат перенос данных")
+    poll_interval = 0.1
+
+    def __init__(self, queue_depth: int = 4):
+        self.queue_depth = queue_depth
+        self._stop = threading.Event()
+        self._errors = []
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=self.poll_interval)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _stage(
+        self, func: Callable, source: queue.Queue, target: Optional[queue.Queue]
+    ) -> None:
+        try:
+            while (item := self._get(source)) is not _DONE:
+                result = func(item)
+                if target is not None and not self._put(target, result):
+                    break
+        except BaseException as exc:
+            self._errors.append(exc)
+            self._stop.set()
+        finally:
+            if target is not None:
+                self._put(target, _DONE)
+
+    def run(self, batches: Iterable, transform: Callable, write: Callable) -> None:
+        to_transform = queue.Queue(maxsize=self.queue_depth)
+        to_write = queue.Queue(maxsize=self.queue_depth)
+        threads = [
+            threading.Thread(target=self._stage, args=(transform, to_transform, to_write)),
+            threading.Thread(target=self._stage, args=(write, to_write, None)),
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for batch in batches:
+                if not self._put(to_transform, batch):
+                    break
+            self._put(to_transform, _DONE)
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+
+def _pipeline_transfer(
+    pg_conn: _connection,
+    table: str,
+    batches: Iterable,
+    write_batch,
+    save_checkpoint: Callable,
+    queue_depth: int,
+    upsert: bool = False,
+    refresh_read_model: bool = True,
+) -> int:
+    """Прогнать батчи (контрольная точка, строки) через BatchPipeline"""
+    rows = 0
+    if refresh_read_model:
+        with pg_conn.cursor() as cursor:
+            refresh_read_model = read_model.exists(cursor)
+    key_index = TABLE_COLUMNS[table].index(read_model.SOURCE_KEYS[table])
+
+    def transform(item):
+        checkpoint, data_batch = item
+        return checkpoint, to_columns(data_batch, table), len(data_batch)
+
+    def write(item):
+        nonlocal rows
+        checkpoint, columns, count = item
+        # Контрольная точка фиксируется в той же транзакции, что и батч
+        save_checkpoint(checkpoint)
+        write_batch(pg_conn, columns, table, upsert=upsert)
+        if refresh_read_model:
+            # Отдельная транзакция после батча: при сбое между ними строки
+            # модели чтения останутся старыми до rebuild_read_model
+            with pg_conn.cursor() as cursor:
+                read_model.refresh_for(cursor, table, columns[key_index])
+            pg_conn.commit()
+        rows += count
+
+    BatchPipeline(queue_depth).run(batches, transform, write)
+    return rows
+
+
+def plan_rowid_ranges(
+    connection: sqlite3.Connection, pg_conn: _connection, table: str, parts: int
+) -> List[Tuple[int, Optional[int]]]:
+    """Диапазоны rowid таблицы: (начало, конец); у последнего конца нет.
+
+    Контрольная точка диапазона хранится по его началу. Если таблица уже
+    переносилась, диапазоны берутся из ее контрольных точек, а не делятся
+    заново: иначе продолжение с другими --workers/--ranges не нашло бы
+    прежних точек и перечитало бы таблицу целиком. Новое деление
+    записывается сразу для всех диапазонов, в том числе еще не начатых.
+    """
+    checkpoints = CheckpointStore()
+    starts = checkpoints.range_starts(pg_conn, table)
+    if not starts:
+        split = SQLiteExtractor().split_rowid_ranges(connection, table, parts)
+        starts = [start for start, _ in split] or [0]
+        for start in starts:
+            checkpoints.save(pg_conn, table, "rowid", start, start - 1)
+        pg_conn.commit()
+    ends = [start - 1 for start in starts[1:]] + [None]
+    return list(zip(starts, ends))
+
+
+def transfer_table(
+    connection: sqlite3.Connection,
+    pg_conn: _connection,
+    table: str,
+    write_batch,
+    batch_size: int,
+    rowid_range: Optional[Tuple[int, Optional[int]]] = None,
+    queue_depth: int = 4,
+    refresh_read_model: bool = True,
+) -> int:
+    """Перенести таблицу (или диапазон rowid) с контрольной точки и вернуть число строк"""
+    if rowid_range is None:
+        # Вся таблица - это все ее диапазоны, в том числе из параллельного запуска
+        return sum(
+            transfer_table(
+                connection,
+                pg_conn,
+                table,
+                write_batch,
+                batch_size,
+                table_range,
+                queue_depth=queue_depth,
+                refresh_read_model=refresh_read_model,
+            )
+            for table_range in plan_rowid_ranges(connection, pg_conn, table, 1)
+        )
+
+    checkpoints = CheckpointStore()
+    range_start, range_end = rowid_range
+    last_rowid, _ = checkpoints.get(pg_conn, table, "rowid", range_start)
+    data_batch_generator = SQLiteExtractor().extract_rows_after_rowid(
+        connection,
+        table,
+        batch_size,
+        after_rowid=max(last_rowid, range_start - 1),
+        upto_rowid=range_end,
+    )
+    return _pipeline_transfer(
+        pg_conn,
+        table,
+        data_batch_generator,
+        write_batch,
+        lambda last_rowid: checkpoints.save(
+            pg_conn, table, "rowid", range_start, last_rowid
+        ),
+        queue_depth,
+        refresh_read_model=refresh_read_model,
+    )
+
+
+def sync_table(
+    connection: sqlite3.Connection,
+    pg_conn: _connection,
+    table: str,
+    write_batch,
+    batch_size: int,
+    queue_depth: int = 4,
+    refresh_read_model: bool = True,
+) -> int:
+    """Перенести строки, измененные после прошлого запуска, и вернуть их число"""
+    if "updated_at" not in TABLE_COLUMNS[table]:
+        # В таблицах связей нет updated_at: строки только добавляются,
+        # поэтому достаточно контрольной точки по rowid
+        return transfer_table(
+            connection,
+            pg_conn,
+            table,
+            write_batch,
+            batch_size,
+            queue_depth=queue_depth,
+            refresh_read_model=refresh_read_model,
+        )
+
+    checkpoints = CheckpointStore()
+    last_rowid, last_updated_at = checkpoints.get(pg_conn, table, "updated_at")
+    data_batch_generator = SQLiteExtractor().extract_changed_rows(
+        connection, table, batch_size, last_updated_at, last_rowid
+    )
+    return _pipeline_transfer(
+        pg_conn,
+        table,
+        data_batch_generator,
+        write_batch,
+        lambda watermark: checkpoints.save(
+            pg_conn, table, "updated_at", 0, watermark[1], watermark[0]
+        ),
+        queue_depth,
+        upsert=True,
+        refresh_read_model=refresh_read_model,
+    )
+
+
+def report_rate(table: str, rows: int, elapsed: float) -> None:
+    rate = rows / elapsed if elapsed else 0
+    logger.info(
+        "Таблица %s: %d строк за %.2f с (%.0f строк/с)",
+        table,
+        rows,
+        elapsed,
+        rate,
+        extra={"table": table, "rows": rows, "seconds": round(elapsed, 3)},
+    )
+
+
+def load_from_sqlite(
+    connection: sqlite3.Connection,
+    pg_conn: _connection,
+    mode: str = "insert",
+    incremental: bool = False,
+    batch_size: int = 1000,
+    queue_depth: int = 4,
+    refresh_read_model: bool = True,
+):
+    """Основной метод загрузки данных из SQLite в Postgres.
+
+    refresh_read_model: пересчитывать модель чтения после каждого батча;
+    при массовой загрузке ее дешевле пересчитать целиком в конце.
+    """
+    logger.info("Начат перенос данных")
 
-    print("Создание класса для сохранения в Postgres")
     postgres_saver = PostgresSaver()
+    write_batch = getattr(postgres_saver, WRITER_MODES[mode])
+    CheckpointStore().ensure(pg_conn)
+    transfer = sync_table if incremental else transfer_table
+
+    for table in TABLE_TYPE_TO_TRANSFER:
+        logger.info("Запись таблицы %s (режим %s)", table, mode)
+        started = time.perf_counter()
+        rows = transfer(
+            connection,
+            pg_conn,
+            table,
+            write_batch,
+            batch_size,
+            queue_depth=queue_depth,
+            refresh_read_model=refresh_read_model,
+        )
+        report_rate(table, rows, time.perf_counter() - started)
+
 
-    print("Создание класса для считывания из Sqlite")
-    sqlite_extractor = SQLiteExtractor()
+class ParallelLoader:
+    """Параллельный перенос: пул потоков, у каждого потока свои соединения"""
+
+    def __init__(
+        self,
+        db_path: str,
+        dsl: dict,
+        mode: str = "insert",
+        workers: int = 4,
+        ranges: int = 1,
+        batch_size: int = 1000,
+        incremental: bool = False,
+        queue_depth: int = 4,
+        refresh_read_model: bool = True,
+    ):
+        self.db_path = db_path
+        self.dsl = dsl
+        self.mode = mode
+        self.workers = workers
+        self.ranges = ranges
+        self.batch_size = batch_size
+        self.incremental = incremental
+        self.queue_depth = queue_depth
+        self.refresh_read_model = refresh_read_model
+        self._local = threading.local()
+        self._opened = []
+        self._lock = threading.Lock()
 
-    table_type_to_transfer = {
-        "genre": Genre,
-        "person": Person,
-        "film_work": Filmwork,
-        "genre_film_work": GenreFilmwork,
-        "person_film_work": PersonFilmwork,
-    }
-    batch_size = 1000
+    def _connections(self) -> Tuple[sqlite3.Connection, _connection]:
+        """Соединения текущего потока, создаются при первом обращении"""
+        if not hasattr(self._local, "pg_conn"):
+            sqlite_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            sqlite_conn.row_factory = sqlite3.Row
+            pg_conn = psycopg2.connect(**self.dsl, cursor_factory=DictCursor)
+            self._local.sqlite_conn = sqlite_conn
+            self._local.pg_conn = pg_conn
+            with self._lock:
+                self._opened.extend((sqlite_conn, pg_conn))
+        return self._local.sqlite_conn, self._local.pg_conn
 
-    for table in table_type_to_transfer:
-        total = postgres_saver.count_records(pg_conn, table)
-        if total == 0:
-            print(f"Считывание таблицы {table}")
-            data_batch_generator = sqlite_extractor.extract_data_batch(
-                connection, table, table_type_to_transfer[table], batch_size
+    def _transfer_range(
+        self, table: str, rowid_range: Optional[Tuple[int, Optional[int]]]
+    ) -> Tuple[int, float, float]:
+        sqlite_conn, pg_conn = self._connections()
+        write_batch = getattr(PostgresSaver(), WRITER_MODES[self.mode])
+        started = time.perf_counter()
+        if self.incremental:
+            rows = sync_table(
+                sqlite_conn,
+                pg_conn,
+                table,
+                write_batch,
+                self.batch_size,
+                queue_depth=self.queue_depth,
+                refresh_read_model=self.refresh_read_model,
             )
-            print(f"Запись таблицы {table}")
-            for data_batch in data_batch_generator:
-                postgres_saver.save_all(pg_conn, data_batch, table)
+        else:
+            rows = transfer_table(
+                sqlite_conn,
+                pg_conn,
+                table,
+                write_batch,
+                self.batch_size,
+                rowid_range,
+                queue_depth=self.queue_depth,
+                refresh_read_model=self.refresh_read_model,
+            )
+        return rows, started, time.perf_counter()
+
+    def _plan(
+        self, tables: Tuple[str, ...]
+    ) -> Dict[str, List[Optional[Tuple[int, Optional[int]]]]]:
+        """Диапазоны rowid для каждой таблицы этапа"""
+        sqlite_conn, pg_conn = self._connections()
+        CheckpointStore().ensure(pg_conn)
+        if self.incremental:
+            # Водяной знак updated_at общий на таблицу, диапазоны не делим
+            return {table: [None] for table in tables}
+        return {
+            table: plan_rowid_ranges(sqlite_conn, pg_conn, table, self.ranges)
+            for table in tables
+        }
+
+    def _run_stage(self, executor: ThreadPoolExecutor, tables: Tuple[str, ...]) -> None:
+        plan = executor.submit(self._plan, tables).result()
+        futures = {
+            table: [
+                executor.submit(self._transfer_range, table, rowid_range)
+                for rowid_range in table_ranges
+            ]
+            for table, table_ranges in plan.items()
+        }
+        for table, table_futures in futures.items():
+            results = [future.result() for future in table_futures]
+            if not results:
+                continue
+            rows = sum(result[0] for result in results)
+            elapsed = max(result[2] for result in results) - min(
+                result[1] for result in results
+            )
+            report_rate(table, rows, elapsed)
+
+    def run(self) -> None:
+        logger.info(
+            "Начат параллельный перенос данных: потоков %d, диапазонов на таблицу %d, режим %s",
+            self.workers,
+            self.ranges,
+            self.mode,
+        )
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                self._run_stage(executor, PARENT_TABLES)
+                self._run_stage(executor, LINK_TABLES)
+        finally:
+            for conn in self._opened:
+                conn.close()
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Перенос данных из SQLite в Postgres")
+    parser.add_argument(
+        "--mode",
+        choices=WRITER_MODES,
+        default="insert",
+        help="Способ записи в Postgres: insert или copy",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Число параллельных потоков; 1 - последовательная загрузка",
+    )
+    parser.add_argument(
+        "--ranges",
+        type=int,
+        default=1,
+        help="На сколько диапазонов rowid делить каждую таблицу; "
+        "при возобновлении используются диапазоны прошлого запуска",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Перенести только строки, измененные после прошлого запуска",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Число строк в одном батче",
+    )
+    parser.add_argument(
+        "--queue-depth",
+        type=int,
+        default=4,
+        help="Сколько батчей может ждать записи между этапами конвейера",
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Удалить вторичные индексы и внешние ключи на время загрузки, "
+        "затем восстановить их и выполнить ANALYZE",
+    )
+    parser.add_argument(
+        "--concurrently",
+        action="store_true",
+        help="В режиме --bulk пересоздавать индексы через CREATE INDEX CONCURRENTLY",
+    )
+    return parser
 
 
 if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+
     load_dotenv()
+    configure_logging()
+
+    dsl = loader_dsl()
 
-    DATABASE_NAME = os.getenv("DB_NAME")
-    DATABASE_USER = os.getenv("DB_USER")
-    DATABASE_PASSWORD = os.getenv("DB_PASSWORD")
-    DATABASE_HOST = os.getenv("DB_HOST")
-    DATABASE_PORT = "5432"
-
-    dsl = {
-        "dbname": DATABASE_NAME,
-        "user": DATABASE_USER,
-        "password": DATABASE_PASSWORD,
-        "host": DATABASE_HOST,
-        "port": int(DATABASE_PORT),
-    }
-
-    with conn_context("db.sqlite") as sqlite_conn:
-        # Используем contextlib.closing для управления psycopg2.connect
-        with closing(psycopg2.connect(**dsl, cursor_factory=DictCursor)) as pg_conn:
-            load_from_sqlite(sqlite_conn, pg_conn)
+    load_mode = (
+        bulk_load_mode(dsl, concurrently=args.concurrently)
+        if args.bulk
+        else nullcontext()
+    )
+    with load_mode:
+        if args.workers > 1:
+            ParallelLoader(
+                "db.sqlite",
+                dsl,
+                mode=args.mode,
+                workers=args.workers,
+                ranges=args.ranges,
+                batch_size=args.batch_size,
+                incremental=args.incremental,
+                queue_depth=args.queue_depth,
+                refresh_read_model=not args.bulk,
+            ).run()
+        else:
+            with conn_context("db.sqlite") as sqlite_conn:
+                # Используем contextlib.closing для управления psycopg2.connect
+                with closing(psycopg2.connect(**dsl, cursor_factory=DictCursor)) as pg_conn:
+                    load_from_sqlite(
+                        sqlite_conn,
+                        pg_conn,
+                        mode=args.mode,
+                        incremental=args.incremental,
+                        batch_size=args.batch_size,
+                        queue_depth=args.queue_depth,
+                        refresh_read_model=not args.bulk,
+                    )
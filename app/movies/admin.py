@@ -1,18 +1,52 @@
+import uuid
+
 from django.contrib import admin
+from django.db.models import FloatField, Value
 from .models import Genre, Filmwork, GenreFilmwork, Person, PersonFilmwork
+from .paginator import EstimatedCountPaginator
+
+
+class RankedSearchMixin:
+    """Поиск в списке через полнотекстовый индекс (QuerySet.search)
+    с сортировкой по релевантности; UUID ищется по первичному ключу"""
+
+    def get_queryset(self, request):
+        # tsvector нужен только в условиях поиска, в список его не читаем
+        return super().get_queryset(request).defer("search_vector")
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        try:
+            object_id = uuid.UUID(search_term)
+        except ValueError:
+            # search() сортирует по -rank; ChangeList добавляет сортировку
+            # queryset после своей, а get_ordering() тут не годится: он
+            # применяется до поиска, когда аннотации rank еще нет
+            return queryset.search(search_term), False
+        rank = Value(1.0, output_field=FloatField())
+        return queryset.filter(pk=object_id).annotate(rank=rank), False
 
 
 @admin.register(Genre)
 class GenreAdmin(admin.ModelAdmin):
-    pass
+    # Нужен для автодополнения жанра во вкладке фильма
+    search_fields = ("name",)
 
 
 class GenreFilmworkInline(admin.TabularInline):
     model = GenreFilmwork
 
+    # Вместо <select> со всеми жанрами - поиск через autocomplete
+    autocomplete_fields = ("genre",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("genre")
+
 
 @admin.register(Filmwork)
-class FilmworkAdmin(admin.ModelAdmin):
+class FilmworkAdmin(RankedSearchMixin, admin.ModelAdmin):
     inlines = (GenreFilmworkInline,)
 
     # Отображение полей в списке
@@ -36,15 +70,38 @@ class FilmworkAdmin(admin.ModelAdmin):
     # Фильтрация в списке
     list_filter = ("type",)
 
-    # Поиск по полям
-    search_fields = ("title", "description", "id")
+    # Поиск по полям через RankedSearchMixin: полнотекстовый по названию
+    # и описанию, подстрока названия, точный id
+    search_fields = ("title", "description")
+
+    # На большом каталоге COUNT(*) дорог: без фильтров берем оценку
+    # из pg_class, а общее число строк рядом с результатами поиска не считаем
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 class PersonFilmworkInline(admin.TabularInline):
     model = PersonFilmwork
 
+    # <select> отрисовывал бы все фильмы и всех людей в каждой строке;
+    # autocomplete ищет через RankedSearchMixin по полнотекстовому индексу
+    autocomplete_fields = ("film_work", "person")
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("film_work", "person")
+            .defer("film_work__search_vector", "person__search_vector")
+        )
+
 
 @admin.register(Person)
-class PersonAdmin(admin.ModelAdmin):
+class PersonAdmin(RankedSearchMixin, admin.ModelAdmin):
     list_display = ('id', 'full_name')
+    search_fields = ('full_name',)
     inlines = (PersonFilmworkInline,)
+
+    # Список людей и autocomplete по ним тоже не считают COUNT(*) без фильтров
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
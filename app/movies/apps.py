@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class MoviesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'movies'
+
+    def ready(self):
+        # Сброс кеша при изменении жанров, людей и фильмов
+        from . import signals  # noqa: F401
+        # Счетчик открытых соединений с БД
+        from . import db  # noqa: F401
@@ -1,73 +1,165 @@
+import hashlib
 import http
+import logging
+import uuid
 from enum import StrEnum, auto
 
+import httpx
 import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import BaseBackend
+from django.core.cache import cache
 from django.db import IntegrityError
 
+from movies.auth_client import (
+    AuthServiceUnavailable,
+    get_async_auth_client,
+    get_auth_client,
+)
+from movies.metrics import AUTH_PROFILE_CACHE
+
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+PROFILE_CACHE_KEY = "auth:profile:{}"
+
+
 class Roles(StrEnum):
     ADMIN = auto()
     SUBSCRIBER = auto()
 
 class CustomBackend(BaseBackend):
+    """Вход через сервис авторизации.
+
+    authenticate() ходит в сервис синхронно (WSGI, админка), aauthenticate()
+    - через асинхронный клиент, не занимая поток на время ожидания (ASGI).
+    Разбор ответов и профиля у них общий.
+    """
+
     def authenticate(self, request, username=None, password=None):
         # Авторизация пользователя
-        auth_response = self._get_auth_response(username, password)
-        if not auth_response or auth_response.status_code != http.HTTPStatus.OK:
-            print("Auth response error or not OK")
+        try:
+            auth_response = get_auth_client().post(**self._login_request(username, password))
+        except (requests.RequestException, AuthServiceUnavailable) as e:
+            logger.warning("Auth service request failed", extra={"error": repr(e)})
             return None
-
-        auth_data = auth_response.json()
-        if "access_token" not in auth_data:
-            print("No access token in auth data")
+        access_token = self._access_token(auth_response)
+        if access_token is None:
             return None
 
         # Получение информации о пользователе
-        user_response = self._get_user_response(auth_data.get("access_token"))
-        if not user_response or user_response.status_code != http.HTTPStatus.OK:
-            print("User response error or not OK")
+        key = self._profile_cache_key(username)
+        user_data = self._cached_profile(cache.get(key))
+        if user_data is None:
+            try:
+                user_response = get_auth_client().post(**self._me_request(access_token))
+            except (requests.RequestException, AuthServiceUnavailable) as e:
+                logger.warning("Auth service request failed", extra={"error": repr(e)})
+                return None
+            user_data = self._user_data(user_response)
+            if user_data is None:
+                return None
+            cache.set(key, user_data, settings.AUTH_PROFILE_CACHE_TTL)
+
+        return self._create_or_update_user(user_data)
+
+    async def aauthenticate(self, request, username=None, password=None):
+        if settings.SERVER_MODE != "asgi":
+            # Под WSGI у асинхронного view свой event loop на каждый запрос:
+            # асинхронный клиент создавался бы заново без keep-alive,
+            # синхронный держит пул соединений процесса
+            return await sync_to_async(self.authenticate)(request, username, password)
+        client = get_async_auth_client()
+        try:
+            auth_response = await client.post(**self._login_request(username, password))
+        except (httpx.HTTPError, AuthServiceUnavailable) as e:
+            logger.warning("Auth service request failed", extra={"error": repr(e)})
+            return None
+        access_token = self._access_token(auth_response)
+        if access_token is None:
             return None
 
-        user_data = user_response.json()
-        user = self._create_or_update_user(user_data)
-        return user
+        key = self._profile_cache_key(username)
+        user_data = self._cached_profile(await cache.aget(key))
+        if user_data is None:
+            try:
+                user_response = await client.post(**self._me_request(access_token))
+            except (httpx.HTTPError, AuthServiceUnavailable) as e:
+                logger.warning("Auth service request failed", extra={"error": repr(e)})
+                return None
+            user_data = self._user_data(user_response)
+            if user_data is None:
+                return None
+            await cache.aset(key, user_data, settings.AUTH_PROFILE_CACHE_TTL)
+
+        return await sync_to_async(self._create_or_update_user)(user_data)
+
+    def _access_token(self, auth_response):
+        # Тело ответа не логируется: в нем токен
+        if auth_response.status_code != http.HTTPStatus.OK:
+            logger.info("Login rejected", extra={"status": auth_response.status_code})
+            return None
 
-    def _get_auth_response(self, username, password):
-        url = settings.AUTH_API_LOGIN_URL
-        headers = {
-            "User-Agent": "My User Agent 1.0",
-            "accept": "application/json",
-            "Content-Type": "application/x-www-form-urlencoded",
-        }
-        data = {
-            "grant_type": "",
-            "username": username,
-            "password": password,
-            "scope": "",
-            "client_id": "",
-            "client_secret": "",
+        auth_data = auth_response.json()
+        if "access_token" not in auth_data:
+            logger.warning("No access token in auth response")
+            return None
+        return auth_data["access_token"]
+
+    def _user_data(self, user_response):
+        if user_response.status_code != http.HTTPStatus.OK:
+            logger.warning(
+                "Profile request failed", extra={"status": user_response.status_code}
+            )
+            return None
+        return user_response.json()
+
+    def _profile_cache_key(self, username):
+        """Профиль /user/me кешируется на AUTH_PROFILE_CACHE_TTL секунд.
+
+        Ключ - логин, а не токен: токен новый при каждом входе, и кеш
+        по нему не срабатывал бы. Из кеша профиль берется только после
+        успешного обмена логина и пароля на токен.
+        """
+        # Хеш, чтобы произвольный логин давал допустимый ключ кеша
+        username_hash = hashlib.sha256(username.encode()).hexdigest()
+        return PROFILE_CACHE_KEY.format(username_hash)
+
+    def _cached_profile(self, user_data):
+        AUTH_PROFILE_CACHE.labels("miss" if user_data is None else "hit").inc()
+        return user_data
+
+    def _login_request(self, username, password):
+        return {
+            "url": settings.AUTH_API_LOGIN_URL,
+            "headers": {
+                "User-Agent": "My User Agent 1.0",
+                "accept": "application/json",
+                "Content-Type": "application/x-www-form-urlencoded",
+            },
+            "data": {
+                "grant_type": "",
+                "username": username,
+                "password": password,
+                "scope": "",
+                "client_id": "",
+                "client_secret": "",
+            },
         }
-        response = requests.post(url, headers=headers, data=data)
-        print("Auth response status:", response.status_code)
-        print("Auth response content:", response.content)
-        return response
-
-    def _get_user_response(self, access_token):
-        url = settings.AUTH_API_ME_URL
-        headers = {
-            "User-Agent": "My User Agent 1.0",
-            "accept": "application/json",
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/x-www-form-urlencoded",
+
+    def _me_request(self, access_token):
+        return {
+            "url": settings.AUTH_API_ME_URL,
+            "headers": {
+                "User-Agent": "My User Agent 1.0",
+                "accept": "application/json",
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": "application/x-www-form-urlencoded",
+            },
         }
-        response = requests.post(url, headers=headers)
-        print("User response status:", response.status_code)
-        print("User response content:", response.content)
-        return response
 
     def _create_or_update_user(self, data):
         try:
@@ -77,37 +169,54 @@ class CustomBackend(BaseBackend):
                 if field not in data or not data[field]:
                     raise ValueError(f"{field} not provided or is empty in data")
 
-            # Получение или создание пользователя по ID
-            user, created = User.objects.get_or_create(id=data["id"])
-
-            # Обновление полей пользователя, если они не пустые
-            user.email = data["email"]
-            user.username = data["login"]
-            user.first_name = data["first_name"]
-            user.last_name = data["last_name"]
-            user.is_active = True
-            user.is_admin = True
-
-            # Проверка перед сохранением, чтобы избежать нарушения уникальных ограничений
-            if User.objects.filter(username=user.username).exclude(id=user.id).exists():
-                raise IntegrityError(f"Username {user.username} already exists.")
-
-            user.save()
-            print(f"User {user} created or updated")
-            print(f"User details after save: {user.__dict__}")
+            # Поля пользователя, которые берутся из профиля сервиса авторизации
+            profile = {
+                "email": data["email"],
+                "username": data["login"],
+                "first_name": data["first_name"],
+                "last_name": data["last_name"],
+                "is_active": True,
+                "is_admin": True,
+            }
+
+            # UUID, а не строка из JSON: иначе pk нового пользователя - str,
+            # а найденного в БД - UUID
+            user_id = uuid.UUID(str(data["id"]))
+            user = User.objects.filter(id=user_id).first()
+            if user is not None and all(
+                getattr(user, name) == value for name, value in profile.items()
+            ):
+                # Профиль не изменился - запись в БД не нужна
+                return user
+
+            if user is None:
+                user = User(id=user_id)
+            for name, value in profile.items():
+                setattr(user, name, value)
+
+            # Один INSERT ... ON CONFLICT (id) DO UPDATE вместо get_or_create и save;
+            # занятый другим пользователем username дает IntegrityError
+            # от уникального индекса, отдельная проверка exists() не нужна
+            User.objects.bulk_create(
+                [user],
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=list(profile),
+            )
+            logger.info("User created or updated", extra={"user_id": str(user.id)})
             return user
 
         except IntegrityError as e:
-            print(f"IntegrityError occurred: {e}")
+            logger.warning("User upsert conflict", extra={"error": str(e)})
             return None
         except KeyError as e:
-            print(f"Missing key in data: {e}")
+            logger.warning("Missing key in profile", extra={"error": str(e)})
             return None
         except ValueError as e:
-            print(f"Value error: {e}")
+            logger.warning("Invalid profile", extra={"error": str(e)})
             return None
-        except Exception as e:
-            print(f"Exception occurred: {e}")
+        except Exception:
+            logger.exception("User upsert failed")
             return None
 
     def get_user(self, user_id):
@@ -0,0 +1,180 @@
+import asyncio
+import http
+import os
+import threading
+import time
+import weakref
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from movies.metrics import track_auth_call
+
+
+class AuthServiceUnavailable(Exception):
+    """Сервис авторизации недоступен, запрос не отправлялся"""
+
+
+class CircuitBreaker:
+    """Размыкается после threshold ошибок подряд и пропускает
+    пробный запрос не раньше чем через reset_timeout секунд"""
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Полуоткрытое состояние: один пробный запрос
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+
+
+RETRY_STATUSES = (
+    http.HTTPStatus.BAD_GATEWAY,
+    http.HTTPStatus.SERVICE_UNAVAILABLE,
+    http.HTTPStatus.GATEWAY_TIMEOUT,
+)
+
+
+class AuthClient:
+    """HTTP-клиент сервиса авторизации на общем requests.Session:
+    keep-alive соединения из пула, таймауты, повторы и circuit breaker"""
+
+    def __init__(self):
+        retry = Retry(
+            total=settings.AUTH_API_RETRIES,
+            backoff_factor=settings.AUTH_API_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.AUTH_API_POOL_SIZE,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.timeout = (settings.AUTH_API_CONNECT_TIMEOUT, settings.AUTH_API_READ_TIMEOUT)
+        self.breaker = CircuitBreaker(
+            settings.AUTH_API_BREAKER_THRESHOLD,
+            settings.AUTH_API_BREAKER_RESET_TIMEOUT,
+        )
+
+    def post(self, url, **kwargs) -> requests.Response:
+        if not self.breaker.allow():
+            raise AuthServiceUnavailable(url)
+        try:
+            with track_auth_call():
+                response = self.session.post(url, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+        if response.status_code >= http.HTTPStatus.INTERNAL_SERVER_ERROR:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+
+class AsyncAuthClient:
+    """Асинхронный вариант AuthClient на httpx.AsyncClient для ASGI:
+    ожидание ответа не занимает поток, пока event loop обслуживает
+    другие запросы. Circuit breaker общий с синхронным клиентом процесса."""
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.AUTH_API_READ_TIMEOUT,
+                connect=settings.AUTH_API_CONNECT_TIMEOUT,
+            ),
+            # limits задаются транспорту: при явном transport= httpx
+            # игнорирует limits= клиента
+            transport=httpx.AsyncHTTPTransport(
+                retries=settings.AUTH_API_RETRIES,
+                limits=httpx.Limits(
+                    max_keepalive_connections=settings.AUTH_API_POOL_SIZE
+                ),
+            ),
+        )
+        self.breaker = breaker
+
+    async def post(self, url, **kwargs) -> httpx.Response:
+        if not self.breaker.allow():
+            raise AuthServiceUnavailable(url)
+        # Транспорт повторяет только ошибки соединения; 502/503/504
+        # повторяем сами с той же экспоненциальной задержкой, что и Retry
+        for attempt in range(settings.AUTH_API_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(settings.AUTH_API_BACKOFF_FACTOR * 2 ** (attempt - 1))
+            try:
+                with track_auth_call():
+                    response = await self.client.post(url, **kwargs)
+            except httpx.HTTPError:
+                self.breaker.record_failure()
+                raise
+            if response.status_code not in RETRY_STATUSES:
+                break
+        if response.status_code >= http.HTTPStatus.INTERNAL_SERVER_ERROR:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+# Клиенты по event loop: запись исчезает вместе с циклом
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_auth_client() -> AuthClient:
+    """Клиент текущего процесса; после fork воркера создается заново,
+    чтобы процессы не делили сокеты пула"""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = AuthClient()
+                _client_pid = pid
+    return _client
+
+
+def get_async_auth_client() -> AsyncAuthClient:
+    """Асинхронный клиент текущего event loop.
+
+    Соединения httpx привязаны к циклу, поэтому у каждого цикла свой клиент.
+    Под uvicorn цикл в процессе один и клиент живет вместе с ним. Под WSGI
+    асинхронный view получает новый цикл на каждый запрос, и клиент не
+    переиспользовался бы: там CustomBackend ходит через синхронный клиент.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncAuthClient(get_auth_client().breaker)
+    return client
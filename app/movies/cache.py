@@ -0,0 +1,94 @@
+from django.core.cache import cache
+
+from .models import Filmwork, Genre
+
+VERSION_KEY = "content:version:{}"
+
+
+def content_version(name):
+    """Текущая версия группы данных (genre, person); входит в ключи кеша"""
+    return cache.get_or_set(VERSION_KEY.format(name), 1, timeout=None)
+
+
+def bump_content_version(name):
+    """Сделать недействительными все ключи, построенные на версии name"""
+    key = VERSION_KEY.format(name)
+    cache.add(key, 1, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Ключ мог быть вытеснен между add и incr
+        cache.set(key, 2, timeout=None)
+
+
+async def acontent_version(name):
+    return await cache.aget_or_set(VERSION_KEY.format(name), 1, timeout=None)
+
+
+def _filmwork_key(film_work_id, updated_at, genre_version, person_version):
+    # Жанры и люди входят в сериализацию, поэтому их версии - часть ключа;
+    # updated_at меняется при каждом сохранении самого фильма.
+    # v2 - формат serialize_filmwork (роль "" вместо null, сортировка)
+    return (
+        f"filmwork:v2:{film_work_id}:{updated_at.timestamp()}"
+        f":g{genre_version}:p{person_version}"
+    )
+
+
+def filmwork_cache_key(film_work_id, updated_at):
+    return _filmwork_key(
+        film_work_id,
+        updated_at,
+        content_version("genre"),
+        content_version("person"),
+    )
+
+
+def _genres():
+    return Genre.objects.order_by("name").values("id", "name", "description")
+
+
+def cached_genres():
+    """Все жанры, отсортированные по названию"""
+    return cache.get_or_set(
+        f"genres:v{content_version('genre')}", lambda: list(_genres())
+    )
+
+
+async def acached_genres():
+    key = f"genres:v{await acontent_version('genre')}"
+    genres = await cache.aget(key)
+    if genres is None:
+        genres = [genre async for genre in _genres()]
+        await cache.aset(key, genres)
+    return genres
+
+
+def cached_filmwork(film_work_id):
+    """Filmwork.serialize() фильма; Filmwork.DoesNotExist, если его нет"""
+    updated_at = Filmwork.objects.values_list("updated_at", flat=True).get(
+        pk=film_work_id
+    )
+    return cache.get_or_set(
+        filmwork_cache_key(film_work_id, updated_at),
+        lambda: Filmwork.objects.with_relations().get(pk=film_work_id).serialize(),
+    )
+
+
+async def acached_filmwork(film_work_id):
+    updated_at = await Filmwork.objects.values_list("updated_at", flat=True).aget(
+        pk=film_work_id
+    )
+    key = _filmwork_key(
+        film_work_id,
+        updated_at,
+        await acontent_version("genre"),
+        await acontent_version("person"),
+    )
+    film = await cache.aget(key)
+    if film is None:
+        # with_relations собирает жанры и людей в том же запросе,
+        # поэтому serialize() не обращается к БД
+        film = (await Filmwork.objects.with_relations().aget(pk=film_work_id)).serialize()
+        await cache.aset(key, film)
+    return film
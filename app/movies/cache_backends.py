@@ -0,0 +1,82 @@
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_MISSING = object()
+
+
+class TieredCache(BaseCache):
+    """Двухуровневый кеш: локальный LRU процесса перед общим кешем.
+
+    Чтение сначала идет в локальный уровень, промах - в общий, найденное
+    значение кладется локально на TIMEOUT локального кеша. Запись и удаление
+    идут в оба уровня. Другие процессы увидят изменение не позже, чем истечет
+    их локальная копия, поэтому локальный TIMEOUT должен быть коротким.
+    Счетчики (incr) живут только в общем кеше, чтобы быть атомарными.
+
+    OPTIONS: SHARED и LOCAL - алиасы кешей из CACHES.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._shared_alias = options.get("SHARED", "shared")
+        self._local_alias = options.get("LOCAL", "local")
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    @property
+    def local(self):
+        return caches[self._local_alias]
+
+    def _timeouts(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        local_timeout = self.local.default_timeout
+        if timeout is not None and (local_timeout is None or timeout < local_timeout):
+            local_timeout = timeout
+        return timeout, local_timeout
+
+    def get(self, key, default=None, version=None):
+        value = self.local.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self.local.set(key, value, version=version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout, local_timeout = self._timeouts(timeout)
+        self.shared.set(key, value, timeout, version=version)
+        self.local.set(key, value, local_timeout, version=version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout, _ = self._timeouts(timeout)
+        self.local.delete(key, version=version)
+        return self.shared.add(key, value, timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout, _ = self._timeouts(timeout)
+        self.local.delete(key, version=version)
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.local.delete(key, version=version)
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.local.has_key(key, version=version) or self.shared.has_key(
+            key, version=version
+        )
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        self.local.delete(key, version=version)
+        return value
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
@@ -0,0 +1,36 @@
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_lock = threading.Lock()
+_opened = 0
+
+
+@receiver(connection_created)
+def _count_connection(sender, connection, **kwargs):
+    global _opened
+    with _lock:
+        _opened += 1
+
+
+def connection_stats():
+    """Статистика соединений с БД в текущем процессе.
+
+    connections_opened растет на каждое новое соединение: при работающих
+    постоянных соединениях или пуле он почти не меняется между запросами.
+    Для пула psycopg 3 добавляется его get_stats(): размер пула, свободные
+    соединения, число и суммарное время ожиданий.
+    """
+    database = settings.DATABASES["default"]
+    stats = {
+        "connections_opened": _opened,
+        "conn_max_age": database.get("CONN_MAX_AGE", 0),
+        "pool": None,
+    }
+    pool = getattr(connection, "pool", None)
+    if pool is not None:
+        stats["pool"] = pool.get_stats()
+    return stats
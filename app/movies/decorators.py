@@ -0,0 +1,40 @@
+import hmac
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+
+def _authorized(request):
+    token = settings.INTERNAL_API_TOKEN
+    if not token:
+        return True
+    expected = f"Bearer {token}".encode()
+    return hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected)
+
+
+def _unauthorized():
+    response = HttpResponse("internal API token required", status=401)
+    response["WWW-Authenticate"] = "Bearer"
+    return response
+
+
+def internal_api(view_func):
+    """Служебный маршрут: при заданном INTERNAL_API_TOKEN требует
+    заголовок Authorization: Bearer <токен>; синхронные и асинхронные view"""
+    if iscoroutinefunction(view_func):
+
+        async def _view_wrapper(request, *args, **kwargs):
+            if not _authorized(request):
+                return _unauthorized()
+            return await view_func(request, *args, **kwargs)
+
+    else:
+
+        def _view_wrapper(request, *args, **kwargs):
+            if not _authorized(request):
+                return _unauthorized()
+            return view_func(request, *args, **kwargs)
+
+    return wraps(view_func)(_view_wrapper)
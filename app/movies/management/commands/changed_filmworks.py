@@ -0,0 +1,33 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from movies.models import Filmwork, change_feed_until
+
+
+class Command(BaseCommand):
+    """Django command to list film works changed since a watermark"""
+
+    help = (
+        "Print ids of film works affected by changes to films, genres, persons "
+        "or their links since --since; the new watermark goes to stderr"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", required=True, help="ISO 8601 datetime")
+
+    def handle(self, *args: Any, **options: Any):
+        try:
+            since = parse_datetime(options["since"])
+        except ValueError:
+            since = None
+        if since is None or timezone.is_naive(since):
+            raise CommandError("--since must be an ISO 8601 datetime with a time zone")
+        until = max(change_feed_until(), since)
+
+        for film_work_id in Filmwork.objects.changed_ids(since, until):
+            self.stdout.write(str(film_work_id))
+
+        self.stderr.write(f"until={until.isoformat()}")
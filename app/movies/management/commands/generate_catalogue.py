@@ -0,0 +1,155 @@
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, nullcontext
+from typing import Any
+
+import psycopg2
+from django.core.management.base import BaseCommand
+from dotenv import load_dotenv
+
+from benchmarks.synthetic import CHUNK_SIZE, Catalogue
+from config.db import loader_dsl
+from load_data import (
+    TABLE_TYPE_TO_TRANSFER,
+    PostgresSaver,
+    bulk_load_mode,
+    report_rate,
+    to_columns,
+)
+from movies import read_model
+from movies.cache import bump_content_version
+
+logger = logging.getLogger(__name__)
+
+# Соединение процесса-генератора, открывается в _init_worker
+_pg_conn = None
+
+
+def _init_worker(dsl: dict) -> None:
+    global _pg_conn
+    _pg_conn = psycopg2.connect(**dsl)
+
+
+def _copy(rows: list, table: str) -> None:
+    if rows:
+        PostgresSaver().copy_all(_pg_conn, to_columns(rows, table), table)
+
+
+def _copy_persons(catalogue: Catalogue, start: int, stop: int) -> dict:
+    _copy(list(catalogue.person_rows(start, stop)), "person")
+    return {"person": stop - start}
+
+
+def _copy_films(catalogue: Catalogue, start: int, stop: int) -> dict:
+    """Порция фильмов вместе с их связями; связи пишутся после фильмов,
+    чтобы внешние ключи были выполнены"""
+    rows = catalogue.film_chunk(start, stop)
+    for table in ("film_work", "genre_film_work", "person_film_work"):
+        _copy(rows[table], table)
+    return {table: len(table_rows) for table, table_rows in rows.items()}
+
+
+class Command(BaseCommand):
+    """Django command to generate a synthetic catalogue for load testing"""
+
+    help = (
+        "Generate genres, persons, film works and their links with Zipf-like "
+        "distributions straight into Postgres using COPY"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--films", type=int, default=1_000_000)
+        parser.add_argument("--genres", type=int, default=50)
+        parser.add_argument(
+            "--persons", type=int, default=0, help="Number of persons; films / 2 by default"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="The same seed produces the same rows"
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=4,
+            help=f"Generator processes; work is split into chunks of {CHUNK_SIZE} rows",
+        )
+        parser.add_argument(
+            "--truncate", action="store_true", help="Wipe the catalogue tables first"
+        )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Drop secondary indexes and foreign keys during generation, "
+            "then restore them and run ANALYZE",
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        load_dotenv()
+        dsl = loader_dsl()
+        catalogue = Catalogue(
+            films=options["films"],
+            genres=options["genres"],
+            persons=options["persons"],
+            seed=options["seed"],
+        )
+        self.stdout.write(
+            f"Generating {catalogue.films} film works, {catalogue.persons} persons, "
+            f"{catalogue.genres} genres (seed {catalogue.seed})..."
+        )
+
+        if options["truncate"]:
+            with closing(psycopg2.connect(**dsl)) as pg_conn:
+                PostgresSaver().truncate_tables(pg_conn, TABLE_TYPE_TO_TRANSFER)
+
+        load_mode = bulk_load_mode(dsl) if options["bulk"] else nullcontext()
+        with load_mode:
+            self.generate(dsl, catalogue, options["processes"])
+        if not options["bulk"]:
+            # COPY не обновляет модель чтения; с --bulk ее пересчитывает bulk_load_mode
+            self.rebuild_read_model(dsl)
+
+        # Генератор пишет мимо ORM и сигналов, как и seed_data
+        bump_content_version("genre")
+        bump_content_version("person")
+        self.stdout.write(self.style.SUCCESS("Catalogue has been generated!"))
+
+    def rebuild_read_model(self, dsl: dict) -> None:
+        with closing(psycopg2.connect(**dsl)) as pg_conn:
+            with pg_conn.cursor() as cursor:
+                has_read_model = read_model.exists(cursor)
+            if has_read_model:
+                rows = read_model.rebuild(pg_conn)
+                logger.info("Модель чтения пересчитана: %s строк", rows)
+
+    def generate(self, dsl: dict, catalogue: Catalogue, processes: int) -> None:
+        counts = dict.fromkeys(TABLE_TYPE_TO_TRANSFER, 0)
+        started = time.perf_counter()
+
+        with closing(psycopg2.connect(**dsl)) as pg_conn:
+            rows = list(catalogue.genre_rows())
+            PostgresSaver().copy_all(pg_conn, to_columns(rows, "genre"), "genre")
+            counts["genre"] = len(rows)
+
+        with ProcessPoolExecutor(
+            max_workers=processes, initializer=_init_worker, initargs=(dsl,)
+        ) as pool:
+            # Сначала все люди, затем фильмы: связи ссылаются на тех и других
+            person_chunks = [
+                (start, min(start + CHUNK_SIZE, catalogue.persons))
+                for start in range(0, catalogue.persons, CHUNK_SIZE)
+            ]
+            for stage, job, chunks in (
+                ("person", _copy_persons, person_chunks),
+                ("film_work", _copy_films, list(catalogue.chunks())),
+            ):
+                stage_started = time.perf_counter()
+                futures = [pool.submit(job, catalogue, start, stop) for start, stop in chunks]
+                for future in futures:
+                    for table, count in future.result().items():
+                        counts[table] += count
+                report_rate(stage, counts[stage], time.perf_counter() - stage_started)
+
+        elapsed = time.perf_counter() - started
+        for table, count in counts.items():
+            logger.info("%s: %d строк", table, count, extra={"table": table, "rows": count})
+        report_rate("total", sum(counts.values()), elapsed)
@@ -0,0 +1,25 @@
+"""
+manage.py migrate без лимита DB_STATEMENT_TIMEOUT.
+
+Лимит рассчитан на запросы админки, а миграции на большом каталоге
+(перестройка таблицы, GIN-индексы, заполнение модели чтения) идут дольше
+и прерывались бы на середине выката.
+"""
+from typing import Any
+
+from django.core.management.commands.migrate import Command as MigrateCommand
+from django.db import connections
+
+from config.db import migrate_statement_timeout, server_options
+
+
+class Command(MigrateCommand):
+    def handle(self, *args: Any, **options: Any):
+        connection = connections[options["database"]]
+        # Параметры сессии передаются при подключении: меняем их
+        # и переподключаемся, если соединение уже открыто
+        connection.settings_dict["OPTIONS"]["options"] = server_options(
+            migrate_statement_timeout()
+        )
+        connection.close()
+        return super().handle(*args, **options)
@@ -0,0 +1,39 @@
+import logging
+
+import psycopg2
+from typing import Any
+from django.core.management.base import BaseCommand
+
+from dotenv import load_dotenv
+
+from contextlib import closing
+
+from config.db import loader_dsl
+from movies import read_model
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the film work read model"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of film works recomputed per transaction",
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        self.stdout.write("Rebuilding the film work read model...")
+
+        load_dotenv()
+        dsl = loader_dsl()
+
+        # Используем contextlib.closing для управления psycopg2.connect
+        with closing(psycopg2.connect(**dsl)) as pg_conn:
+            rows = read_model.rebuild(pg_conn, batch_size=options["batch_size"])
+        logger.info("Модель чтения пересчитана: %s строк", rows, extra={"rows": rows})
+
+        self.stdout.write(self.style.SUCCESS("Read model has been rebuilt!"))
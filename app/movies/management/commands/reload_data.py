@@ -0,0 +1,29 @@
+import psycopg2
+from psycopg2.extras import DictCursor
+from typing import Any
+
+from contextlib import closing
+
+from load_data import TABLE_TYPE_TO_TRANSFER, PostgresSaver
+from movies.management.commands.seed_data import Command as SeedCommand
+
+
+class Command(SeedCommand):
+    """Django command to truncate and bulk reload the database"""
+
+    help = (
+        "Truncate content tables, drop secondary indexes and foreign keys, "
+        "load db.sqlite, restore them and ANALYZE"
+    )
+
+    def handle(self, *args: Any, **options: Any):
+        self.stdout.write("Starting reloading the database...")
+
+        dsl = self.get_dsl()
+        with closing(psycopg2.connect(**dsl, cursor_factory=DictCursor)) as pg_conn:
+            PostgresSaver().truncate_tables(pg_conn, TABLE_TYPE_TO_TRANSFER)
+
+        # Перезагрузка всегда идет в режиме массовой загрузки
+        self.load(dsl, {**options, "bulk": True})
+
+        self.stdout.write(self.style.SUCCESS("Database has beed reloaded!"))
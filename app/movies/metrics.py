@@ -0,0 +1,133 @@
+"""
+Метрики запросов в формате Prometheus.
+
+Под uWSGI и uvicorn процессов несколько; чтобы /metrics отдавал сумму по всем,
+задайте PROMETHEUS_MULTIPROC_DIR (пустой каталог, общий для процессов) до
+запуска сервера - prometheus_client будет писать значения в файлы в нем.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки запроса",
+    ["method", "view", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Число SQL-запросов за один HTTP-запрос",
+    ["view"],
+    buckets=QUERY_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Суммарное время SQL-запросов за один HTTP-запрос",
+    ["view"],
+)
+REQUEST_AUTH_SECONDS = Histogram(
+    "http_request_auth_seconds",
+    "Время запросов к сервису авторизации за один HTTP-запрос",
+    ["view"],
+)
+QUERY_BUDGET_EXCEEDED = Counter(
+    "http_request_query_budget_exceeded",
+    "HTTP-запросы, превысившие REQUEST_QUERY_BUDGET SQL-запросов",
+    ["view"],
+)
+
+AUTH_PROFILE_CACHE = Counter(
+    "auth_profile_cache",
+    "Обращения к кешу профилей /user/me сервиса авторизации",
+    ["result"],
+)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    auth_seconds: float = 0.0
+
+
+_current = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def collect():
+    """Собирать SQL и вызовы сервиса авторизации в RequestStats.
+
+    ContextVar передается и в потоки sync_to_async, поэтому учитываются
+    и запросы асинхронных view.
+    """
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+@receiver(connection_created)
+def _install_query_recorder(sender, connection, **kwargs):
+    # Объект соединения переживает переподключения, обертка ставится один раз
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+@contextmanager
+def track_auth_call():
+    """Учесть время запроса к сервису авторизации в текущем HTTP-запросе"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current.get()
+        if stats is not None:
+            stats.auth_seconds += time.perf_counter() - started
+
+
+def observe(method, view, status, seconds, stats):
+    REQUEST_SECONDS.labels(method, view, status).observe(seconds)
+    REQUEST_QUERIES.labels(view).observe(stats.queries)
+    REQUEST_DB_SECONDS.labels(view).observe(stats.db_seconds)
+    if stats.auth_seconds:
+        REQUEST_AUTH_SECONDS.labels(view).observe(stats.auth_seconds)
+
+
+def render():
+    """Текст /metrics и его Content-Type"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
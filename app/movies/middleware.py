@@ -0,0 +1,62 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """Время запроса, число и время SQL-запросов и время вызовов сервиса
+    авторизации - в гистограммы movies.metrics с меткой view.
+
+    Ставится первым в MIDDLEWARE, чтобы учитывать запросы всех остальных
+    middleware (сессии, пользователь). SQL, выполненный при отдаче
+    StreamingHttpResponse, происходит после выхода из middleware и не учитывается.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with metrics.collect() as stats:
+            response = self.get_response(request)
+        self.observe(request, response, time.perf_counter() - started, stats)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with metrics.collect() as stats:
+            response = await self.get_response(request)
+        self.observe(request, response, time.perf_counter() - started, stats)
+        return response
+
+    def observe(self, request, response, seconds, stats):
+        # Имя маршрута, а не путь: у путей с id неограниченное число значений
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        metrics.observe(request.method, view, response.status_code, seconds, stats)
+        if stats.queries > settings.REQUEST_QUERY_BUDGET:
+            metrics.QUERY_BUDGET_EXCEEDED.labels(view).inc()
+            logger.warning(
+                "Query budget exceeded",
+                extra={
+                    "method": request.method,
+                    "path": request.path,
+                    "view": view,
+                    "queries": stats.queries,
+                    "db_ms": round(stats.db_seconds * 1000),
+                },
+            )
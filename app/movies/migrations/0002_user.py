@@ -10,6 +10,13 @@ class Migration(migrations.Migration):
         ('movies', '0001_initial'),
     ]
 
+    # admin.0001 зависит от AUTH_USER_MODEL только как от movies.__first__,
+    # а пользователь создается здесь: без run_before на чистой базе
+    # admin применяется раньше и migrate падает
+    run_before = [
+        ('admin', '0001_initial'),
+    ]
+
     operations = [
         migrations.CreateModel(
             name='User',
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_user_username'),
+    ]
+
+    # Индексы для ленты изменений (Filmwork.objects.changed_ids)
+    operations = [
+        migrations.AddIndex(
+            model_name='genre',
+            index=models.Index(fields=['updated_at'], name='genre_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='filmwork',
+            index=models.Index(fields=['updated_at'], name='film_work_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['updated_at'], name='person_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genrefilmwork',
+            index=models.Index(fields=['created_at'], name='genre_fw_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personfilmwork',
+            index=models.Index(fields=['created_at'], name='person_fw_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0005_filmwork_changelist_indexes'),
+    ]
+
+    operations = [
+        # Описание ищется по tsvector, триграммный индекс по нему 0005 больше
+        # не создает. Его могли построить прежние версии 0005 - удаляем, если есть
+        migrations.RunSQL(
+            "DROP INDEX IF EXISTS content.film_work_descr_trgm_idx;",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddField(
+            model_name='filmwork',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=(
+                    SearchVector('title', config='russian', weight='A')
+                    + SearchVector('title', config='english', weight='A')
+                    + SearchVector('description', config='russian', weight='B')
+                    + SearchVector('description', config='english', weight='B')
+                ),
+                output_field=SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=(
+                    SearchVector('full_name', config='russian', weight='A')
+                    + SearchVector('full_name', config='english', weight='A')
+                ),
+                output_field=SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='filmwork',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector'], name='film_work_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector'], name='person_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast('full_name', models.TextField())),
+                    name='gin_trgm_ops'),
+                name='person_full_name_trgm_idx'),
+        ),
+    ]
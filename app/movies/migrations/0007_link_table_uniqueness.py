@@ -0,0 +1,113 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_full_text_search'),
+    ]
+
+    operations = [
+        # Перед созданием уникальных ограничений удаляем дубли одним запросом
+        # на таблицу, оставляя самую раннюю связь
+        migrations.RunSQL(
+            """
+            DELETE FROM content.genre_film_work
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY film_work_id, genre_id ORDER BY created_at, id
+                    ) AS position
+                    FROM content.genre_film_work
+                ) AS numbered
+                WHERE numbered.position > 1
+            );
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            """
+            DELETE FROM content.person_film_work
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY film_work_id, person_id, role ORDER BY created_at, id
+                    ) AS position
+                    FROM content.person_film_work
+                ) AS numbered
+                WHERE numbered.position > 1
+            );
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='genrefilmwork',
+            constraint=models.UniqueConstraint(
+                fields=('film_work', 'genre'), name='film_work_genre_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='personfilmwork',
+            # Связи без роли тоже уникальны: NULL в role считается равным NULL
+            # (Postgres 15+). Дубли с NULL удалены выше: PARTITION BY
+            # группирует NULL вместе
+            constraint=models.UniqueConstraint(
+                fields=('film_work', 'person', 'role'),
+                name='film_work_person_role_unique',
+                nulls_distinct=False,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='genrefilmwork',
+            index=models.Index(fields=['genre', 'film_work'], name='genre_fw_genre_film_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personfilmwork',
+            index=models.Index(
+                fields=['person', 'film_work'], include=('role',), name='person_fw_person_film_idx'),
+        ),
+        # Одиночные индексы по внешним ключам покрыты уникальными ограничениями
+        # и индексами (genre, film_work) и (person, film_work). AlterField сам
+        # их не удаляет: интроспекция Django не видит таблиц схемы content
+        # (db_table 'content"."...'), поэтому DROP INDEX пишем явно
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    f"DROP INDEX IF EXISTS content.{name};",
+                    reverse_sql=f"CREATE INDEX IF NOT EXISTS {name} ON content.{table} ({column});",
+                )
+                for name, table, column in (
+                    ('genre_film_work_film_work_id_65abe300', 'genre_film_work', 'film_work_id'),
+                    ('genre_film_work_genre_id_88fbcf0d', 'genre_film_work', 'genre_id'),
+                    ('person_film_work_film_work_id_1724c536', 'person_film_work', 'film_work_id'),
+                    ('person_film_work_person_id_196d24de', 'person_film_work', 'person_id'),
+                )
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='genrefilmwork',
+                    name='film_work',
+                    field=models.ForeignKey(
+                        db_index=False, on_delete=django.db.models.deletion.CASCADE, to='movies.filmwork'),
+                ),
+                migrations.AlterField(
+                    model_name='genrefilmwork',
+                    name='genre',
+                    field=models.ForeignKey(
+                        db_index=False, on_delete=django.db.models.deletion.CASCADE, to='movies.genre'),
+                ),
+                migrations.AlterField(
+                    model_name='personfilmwork',
+                    name='film_work',
+                    field=models.ForeignKey(
+                        db_index=False, on_delete=django.db.models.deletion.CASCADE, to='movies.filmwork'),
+                ),
+                migrations.AlterField(
+                    model_name='personfilmwork',
+                    name='person',
+                    field=models.ForeignKey(
+                        db_index=False, on_delete=django.db.models.deletion.CASCADE, to='movies.person'),
+                ),
+            ],
+        ),
+    ]
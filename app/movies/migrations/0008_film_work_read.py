@@ -0,0 +1,64 @@
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0007_link_table_uniqueness'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FilmworkRead',
+            fields=[
+                ('id', models.UUIDField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255, verbose_name='title')),
+                ('description', models.TextField(null=True, verbose_name='description')),
+                ('creation_date', models.DateField(null=True, verbose_name='creation_date')),
+                ('rating', models.FloatField(null=True, verbose_name='rating')),
+                ('type', models.CharField(max_length=7)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('genres', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), default=list, size=None)),
+                ('persons', models.JSONField(default=dict)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'content"."film_work_read',
+                'indexes': [models.Index(fields=['updated_at', 'id'], name='film_work_read_updated_idx')],
+            },
+        ),
+        # Начальное заполнение одним запросом; дальше таблицу поддерживает
+        # movies.read_model, полный пересчет - команда rebuild_read_model
+        migrations.RunSQL(
+            """
+            INSERT INTO content.film_work_read (
+                id, title, description, creation_date, rating, type,
+                created_at, updated_at, genres, persons, refreshed_at
+            )
+            SELECT fw.id, fw.title, fw.description, fw.creation_date, fw.rating, fw.type,
+                   fw.created_at, fw.updated_at,
+                   COALESCE(genres.names, '{}'), COALESCE(persons.roles, '{}'::jsonb), now()
+            FROM content.film_work fw
+            LEFT JOIN LATERAL (
+                SELECT array_agg(g.name ORDER BY g.name) AS names
+                FROM content.genre_film_work gfw
+                JOIN content.genre g ON g.id = gfw.genre_id
+                WHERE gfw.film_work_id = fw.id
+            ) genres ON true
+            LEFT JOIN LATERAL (
+                SELECT jsonb_object_agg(role, names) AS roles
+                FROM (
+                    SELECT COALESCE(pfw.role, '') AS role,
+                           jsonb_agg(p.full_name ORDER BY p.full_name) AS names
+                    FROM content.person_film_work pfw
+                    JOIN content.person p ON p.id = pfw.person_id
+                    WHERE pfw.film_work_id = fw.id
+                    GROUP BY 1
+                ) by_role
+            ) persons ON true;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_film_work_read'),
+    ]
+
+    operations = [
+        # Выгрузка фильтрует и сортирует по refreshed_at: его меняют и изменения
+        # жанров, людей и связей, а updated_at - только сохранение самого фильма
+        # RemoveIndex выполнил бы DROP INDEX без схемы и не нашел бы индекс
+        # в content, поэтому удаляем его явно, как 0006
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    "DROP INDEX IF EXISTS content.film_work_read_updated_idx;",
+                    reverse_sql=(
+                        "CREATE INDEX IF NOT EXISTS film_work_read_updated_idx "
+                        "ON content.film_work_read (updated_at, id);"
+                    ),
+                ),
+            ],
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name='filmworkread',
+                    name='film_work_read_updated_idx',
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='filmworkread',
+            index=models.Index(
+                fields=['refreshed_at', 'id'], name='film_work_read_refreshed_idx'),
+        ),
+    ]
@@ -1,5 +1,22 @@
+import datetime
+import re
 import uuid
+from collections import defaultdict
+
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+from django.conf import settings
 from django.db import models
+from django.db.models import F, OuterRef, Q
+from django.db.models.functions import Cast, JSONObject, Upper
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import AbstractBaseUser
@@ -70,11 +87,62 @@ class UUIDMixin(models.Model):
         abstract = True
 
 
+# Словари полнотекстового поиска: каталог на русском и английском
+SEARCH_CONFIGS = ("russian", "english")
+
+
+def _search_vector(*weighted_fields):
+    """tsvector по полям для всех SEARCH_CONFIGS, для GeneratedField"""
+    vectors = [
+        SearchVector(field, config=config, weight=weight)
+        for field, weight in weighted_fields
+        for config in SEARCH_CONFIGS
+    ]
+    vector = vectors[0]
+    for other in vectors[1:]:
+        vector = vector + other
+    return vector
+
+
+def _search_query(text):
+    """Запрос по префиксам слов: «иван петр» находит «Иванов Петр»"""
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return None
+    raw = " & ".join(f"{term}:*" for term in terms)
+    query = SearchQuery(raw, search_type="raw", config=SEARCH_CONFIGS[0])
+    for config in SEARCH_CONFIGS[1:]:
+        query = query | SearchQuery(raw, search_type="raw", config=config)
+    return query
+
+
+class SearchQuerySet(models.QuerySet):
+    # Поле, подстрока которого тоже считается совпадением (триграммный индекс)
+    substring_field = None
+
+    def search(self, text):
+        """Полнотекстовый поиск с сортировкой по релевантности (rank)"""
+        query = _search_query(text)
+        if query is None:
+            return self.none()
+        condition = Q(search_vector=query)
+        if self.substring_field:
+            condition |= Q(**{f"{self.substring_field}__icontains": text.strip()})
+        return (
+            self.filter(condition)
+            .annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank")
+        )
+
+
 class Genre(UUIDMixin, TimeStampedMixin):
     name = models.CharField("name", max_length=255)
     description = models.TextField("description", blank=True, null=True)
 
     class Meta:
+        indexes = [
+            models.Index(fields=["updated_at"], name="genre_updated_at_idx"),
+        ]
         db_table = 'content"."genre'
         verbose_name = "Жанр"
         verbose_name_plural = "Жанры"
@@ -83,6 +151,88 @@ class Genre(UUIDMixin, TimeStampedMixin):
         return self.name
 
 
+def serialize_filmwork(film, genres, persons):
+    """Фильм в формате API и выгрузки, общем для Filmwork и FilmworkRead.
+
+    persons - {роль: [имена]}; люди без роли - под ключом "", как в модели
+    чтения. Жанры, роли и имена сортируются здесь, чтобы оба источника
+    давали одинаковый ответ независимо от порядка строк и collation БД.
+    """
+    return {
+        "id": str(film.id),  # Преобразование UUID в строку
+        "title": film.title,
+        "description": film.description,
+        "creation_date": str(film.creation_date) if film.creation_date else None,
+        "rating": float(film.rating) if film.rating is not None else None,
+        "type": film.type,
+        "genres": sorted(genres),
+        "persons": {role: sorted(persons[role]) for role in sorted(persons)},
+    }
+
+
+def change_feed_until():
+    """Верхняя граница выборки изменений: сейчас минус CHANGE_FEED_LAG.
+
+    Строки, записанные транзакциями, которые еще не закоммичены, получат
+    отметку не позже этой границы и не будут пропущены следующей выборкой.
+    """
+    return timezone.now() - datetime.timedelta(seconds=settings.CHANGE_FEED_LAG)
+
+
+class FilmworkQuerySet(SearchQuerySet):
+    substring_field = "title"
+
+    def with_relations(self):
+        """Жанры и участники в том же запросе, что и фильмы.
+
+        Коррелированные подзапросы собирают массивы по каждому фильму,
+        поэтому join-ы не размножают строки и N+1 запросов не возникает.
+        """
+        genres = (
+            GenreFilmwork.objects.filter(film_work=OuterRef("pk"))
+            .order_by("genre__name")
+            .values("genre__name")
+        )
+        persons = (
+            PersonFilmwork.objects.filter(film_work=OuterRef("pk"))
+            .order_by("role", "person__full_name")
+            .values(item=JSONObject(role="role", name="person__full_name"))
+        )
+        return self.defer("search_vector").annotate(
+            genre_names=ArraySubquery(genres),
+            person_roles=ArraySubquery(persons),
+        )
+
+    def serialize(self, chunk_size=2000):
+        """Сериализовать фильмы одним запросом, читая результат порциями"""
+        for film in self.with_relations().iterator(chunk_size=chunk_size):
+            yield film.serialize()
+
+    def changed_ids(self, since, until):
+        """id фильмов, затронутых изменениями в интервале (since, until].
+
+        Учитываются сами фильмы, их жанры и люди (updated_at) и новые связи
+        (created_at). Все части объединены в один запрос UNION, каждая часть -
+        диапазонный поиск по индексу на updated_at/created_at.
+        """
+        return self.filter(updated_at__gt=since, updated_at__lte=until).values_list(
+            "id", flat=True
+        ).union(
+            GenreFilmwork.objects.filter(
+                created_at__gt=since, created_at__lte=until
+            ).values_list("film_work_id", flat=True),
+            GenreFilmwork.objects.filter(
+                genre__updated_at__gt=since, genre__updated_at__lte=until
+            ).values_list("film_work_id", flat=True),
+            PersonFilmwork.objects.filter(
+                created_at__gt=since, created_at__lte=until
+            ).values_list("film_work_id", flat=True),
+            PersonFilmwork.objects.filter(
+                person__updated_at__gt=since, person__updated_at__lte=until
+            ).values_list("film_work_id", flat=True),
+        )
+
+
 class Filmwork(UUIDMixin, TimeStampedMixin):
     class Type(models.TextChoices):
         MOVIE = "movie", _("Movie")
@@ -104,59 +254,168 @@ class Filmwork(UUIDMixin, TimeStampedMixin):
         default=Type.MOVIE,
     )
     genres = models.ManyToManyField(Genre, through="GenreFilmwork")
+    search_vector = models.GeneratedField(
+        expression=_search_vector(("title", "A"), ("description", "B")),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = FilmworkQuerySet.as_manager()
 
     def __str__(self):
         return self.title
 
     class Meta:
+        indexes = [
+            models.Index(fields=["updated_at"], name="film_work_updated_at_idx"),
+            models.Index(fields=["created_at"], name="film_work_created_at_idx"),
+            models.Index(fields=["type", "updated_at"], name="film_work_type_updated_idx"),
+            models.Index(fields=["type", "created_at"], name="film_work_type_created_idx"),
+            # Триграммный индекс под поиск подстроки: icontains в Postgres
+            # превращается в UPPER(col::text) LIKE UPPER('%q%')
+            GinIndex(
+                OpClass(Upper(Cast("title", models.TextField())), name="gin_trgm_ops"),
+                name="film_work_title_trgm_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="film_work_search_idx"),
+        ]
         db_table = 'content"."film_work'
         verbose_name = "Кинопроизведение"
         verbose_name_plural = "Кинопроизведения"
 
     def serialize(self):
-        return {
-            "id": str(self.id),  # Преобразование UUID в строку
-            "title": self.title,
-            "description": self.description,
-            "creation_date": str(self.creation_date) if self.creation_date else None,
-            "rating": float(self.rating) if self.rating is not None else None,
-            "type": self.type,
-            "genres": [genre.name for genre in self.genres.all()],
-        }
+        # Для массовой сериализации используйте Filmwork.objects.serialize():
+        # там жанры и участники уже собраны запросом with_relations
+        if hasattr(self, "genre_names"):
+            genres = self.genre_names
+            person_roles = self.person_roles
+        else:
+            genres = [genre.name for genre in self.genres.all()]
+            person_roles = [
+                {"role": link.role, "name": link.person.full_name}
+                for link in self.personfilmwork_set.select_related("person")
+            ]
+
+        persons = defaultdict(list)
+        for item in person_roles:
+            persons[item["role"] or ""].append(item["name"])
+        return serialize_filmwork(self, genres, persons)
 
 
 class GenreFilmwork(UUIDMixin):
-    film_work = models.ForeignKey("Filmwork", on_delete=models.CASCADE)
-    genre = models.ForeignKey("Genre", on_delete=models.CASCADE)
+    # Отдельные индексы по внешним ключам не нужны: их покрывают
+    # уникальное ограничение (film_work, genre) и индекс (genre, film_work)
+    film_work = models.ForeignKey("Filmwork", on_delete=models.CASCADE, db_index=False)
+    genre = models.ForeignKey("Genre", on_delete=models.CASCADE, db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["film_work", "genre"], name="film_work_genre_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["created_at"], name="genre_fw_created_at_idx"),
+            models.Index(fields=["genre", "film_work"], name="genre_fw_genre_film_idx"),
+        ]
         db_table = 'content"."genre_film_work'
         verbose_name = _("selected_genre")  # 'Выбранный жанр'
         verbose_name_plural = _("selected_genres")  # 'Выбранные жанры'
 
 
+class PersonQuerySet(SearchQuerySet):
+    substring_field = "full_name"
+
+
 class Person(UUIDMixin, TimeStampedMixin):
     full_name = models.CharField("full_name", max_length=255)
+    search_vector = models.GeneratedField(
+        expression=_search_vector(("full_name", "A")),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = PersonQuerySet.as_manager()
 
     class Meta:
         indexes = [
             models.Index(fields=["full_name"], name="full_name_idx"),
+            models.Index(fields=["updated_at"], name="person_updated_at_idx"),
+            GinIndex(
+                OpClass(Upper(Cast("full_name", models.TextField())), name="gin_trgm_ops"),
+                name="person_full_name_trgm_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="person_search_idx"),
         ]
         db_table = 'content"."person'
         verbose_name = "Человек"
         verbose_name_plural = "Люди"
 
+    def __str__(self):
+        return self.full_name
+
 
 class PersonFilmwork(UUIDMixin):
-    film_work = models.ForeignKey("Filmwork", on_delete=models.CASCADE)
-    person = models.ForeignKey("Person", on_delete=models.CASCADE)
+    # Индексы по внешним ключам покрывают уникальное ограничение
+    # (film_work, person, role) и индекс (person, film_work) с ролью в INCLUDE
+    film_work = models.ForeignKey("Filmwork", on_delete=models.CASCADE, db_index=False)
+    person = models.ForeignKey("Person", on_delete=models.CASCADE, db_index=False)
     role = models.TextField("role", null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        constraints = [
+            # NULLS NOT DISTINCT (Postgres 15+): связь без роли тоже уникальна,
+            # иначе ON CONFLICT загрузчика пропускал бы такие дубли
+            models.UniqueConstraint(
+                fields=["film_work", "person", "role"],
+                name="film_work_person_role_unique",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["created_at"], name="person_fw_created_at_idx"),
+            models.Index(
+                fields=["person", "film_work"],
+                include=["role"],
+                name="person_fw_person_film_idx",
+            ),
+        ]
         db_table = 'content"."person_film_work'
         # 'Связь человека с кинопроизведением'
         verbose_name = _("person_film_work_relation")
         # 'Связи людей с кинопроизведениями'
         verbose_name_plural = _("person_film_work_relations")
+
+
+class FilmworkRead(models.Model):
+    """Фильм с жанрами и людьми одной строкой (модель чтения, movies.read_model).
+
+    Заполняется только через movies.read_model, напрямую не изменяется.
+    """
+
+    id = models.UUIDField(primary_key=True)
+    title = models.CharField("title", max_length=255)
+    description = models.TextField("description", null=True)
+    creation_date = models.DateField("creation_date", null=True)
+    rating = models.FloatField("rating", null=True)
+    type = models.CharField(max_length=7)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    genres = ArrayField(models.TextField(), default=list)
+    # {роль: [имена]}
+    persons = models.JSONField(default=dict)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Выгрузка по водяному знаку refreshed_at
+            models.Index(
+                fields=["refreshed_at", "id"], name="film_work_read_refreshed_idx"
+            ),
+        ]
+        db_table = 'content"."film_work_read'
+
+    def serialize(self):
+        return serialize_filmwork(self, self.genres, self.persons)
@@ -0,0 +1,27 @@
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator, который для выборки без фильтров берет число строк
+    из статистики планировщика (pg_class.reltuples) вместо COUNT(*).
+
+    Для отфильтрованной выборки, а также пока таблица ни разу не
+    анализировалась, считается точное количество.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is None or query.where:
+            return super().count
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass;",
+                [self.object_list.model._meta.db_table.replace('"."', ".")],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < 0:
+            return super().count
+        return row[0]
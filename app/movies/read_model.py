@@ -0,0 +1,163 @@
+"""
+Модель чтения content.film_work_read: одна строка на фильм с названиями
+жанров и именами людей по ролям, чтобы выгрузка и списки читали фильм
+без соединений с genre_film_work и person_film_work.
+
+Таблица производная: строки пересчитываются из основных таблиц по id фильмов
+при записи через админку (movies.signals) и после каждого батча загрузчика
+(load_data). rebuild() пересчитывает всю таблицу порциями, не блокируя чтение.
+
+Модуль не зависит от Django: его импортирует и загрузчик. Функции принимают
+курсор или соединение DB-API (psycopg2 или django.db.connection).
+"""
+from typing import Iterable
+
+READ_TABLE = "content.film_work_read"
+
+COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "creation_date",
+    "rating",
+    "type",
+    "created_at",
+    "updated_at",
+    "genres",
+    "persons",
+    "refreshed_at",
+)
+
+# Строки модели чтения для фильмов fw, отобранных условием {where}.
+# Люди без роли попадают под ключ "" (jsonb_object_agg не принимает NULL).
+# ORDER BY: параллельные пересчеты блокируют строки в одном порядке, без взаимоблокировок
+_SELECT = """
+    SELECT fw.id, fw.title, fw.description, fw.creation_date, fw.rating, fw.type,
+           fw.created_at, fw.updated_at,
+           COALESCE(genres.names, '{{}}'), COALESCE(persons.roles, '{{}}'::jsonb), now()
+    FROM content.film_work fw
+    LEFT JOIN LATERAL (
+        SELECT array_agg(g.name ORDER BY g.name) AS names
+        FROM content.genre_film_work gfw
+        JOIN content.genre g ON g.id = gfw.genre_id
+        WHERE gfw.film_work_id = fw.id
+    ) genres ON true
+    LEFT JOIN LATERAL (
+        SELECT jsonb_object_agg(role, names) AS roles
+        FROM (
+            SELECT COALESCE(pfw.role, '') AS role,
+                   jsonb_agg(p.full_name ORDER BY p.full_name) AS names
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id
+            GROUP BY 1
+        ) by_role
+    ) persons ON true
+    WHERE {where}
+    ORDER BY fw.id
+"""
+
+# refreshed_at - водяной знак выгрузки, поэтому строка обновляется, только
+# если ее содержимое изменилось: полный пересчет не выдает весь каталог
+# как измененный
+_CONTENT = COLUMNS[1:-1]
+_UPSERT = (
+    f"INSERT INTO {READ_TABLE} AS r ({', '.join(COLUMNS)}) {_SELECT} "
+    "ON CONFLICT (id) DO UPDATE SET "
+    + ", ".join(f"{column} = EXCLUDED.{column}" for column in COLUMNS[1:])
+    + f" WHERE ({', '.join(f'r.{column}' for column in _CONTENT)})"
+    + f" IS DISTINCT FROM ({', '.join(f'EXCLUDED.{column}' for column in _CONTENT)})"
+)
+
+# id фильмов, затронутых изменением строк таблицы; %s - массив значений
+# колонки SOURCE_KEYS[table] из измененных строк
+_FILM_IDS = {
+    "film_work": "SELECT unnest(%s::uuid[])",
+    "genre_film_work": "SELECT unnest(%s::uuid[])",
+    "person_film_work": "SELECT unnest(%s::uuid[])",
+    "genre": "SELECT film_work_id FROM content.genre_film_work WHERE genre_id = ANY(%s::uuid[])",
+    "person": "SELECT film_work_id FROM content.person_film_work WHERE person_id = ANY(%s::uuid[])",
+}
+
+# Колонка измененной строки, по которой находятся затронутые фильмы
+SOURCE_KEYS = {
+    "film_work": "id",
+    "genre": "id",
+    "person": "id",
+    "genre_film_work": "film_work_id",
+    "person_film_work": "film_work_id",
+}
+
+
+def exists(cursor) -> bool:
+    """Создана ли таблица (миграция могла еще не примениться)"""
+    cursor.execute("SELECT to_regclass(%s);", (READ_TABLE,))
+    return cursor.fetchone()[0] is not None
+
+
+def refresh_for(cursor, table: str, ids: Iterable) -> None:
+    """Пересчитать строки фильмов, затронутых изменением строк table с ключами ids
+    (см. SOURCE_KEYS); строки удаленных фильмов удаляются"""
+    ids = [str(value) for value in ids]
+    if not ids:
+        return
+    film_ids = _FILM_IDS[table]
+    cursor.execute(_UPSERT.format(where=f"fw.id IN ({film_ids})"), (ids,))
+    if table == "film_work":
+        cursor.execute(
+            f"DELETE FROM {READ_TABLE} r WHERE r.id = ANY(%s::uuid[]) "
+            "AND NOT EXISTS (SELECT 1 FROM content.film_work fw WHERE fw.id = r.id);",
+            (ids,),
+        )
+
+
+def truncate(cursor, tables: Iterable[str]) -> None:
+    """Привести таблицу к состоянию после TRUNCATE основных таблиц tables"""
+    tables = set(tables)
+    if "film_work" in tables:
+        cursor.execute(f"TRUNCATE TABLE {READ_TABLE};")
+        return
+    # Очищенная таблица связей отвязывает все фильмы разом
+    if "genre_film_work" in tables:
+        cursor.execute(
+            f"UPDATE {READ_TABLE} SET genres = '{{}}', refreshed_at = now() "
+            "WHERE genres <> '{}';"
+        )
+    if "person_film_work" in tables:
+        cursor.execute(
+            f"UPDATE {READ_TABLE} SET persons = '{{}}'::jsonb, refreshed_at = now() "
+            "WHERE persons <> '{}'::jsonb;"
+        )
+
+
+def rebuild(connection, batch_size: int = 5000) -> int:
+    """Пересчитать всю таблицу порциями по batch_size фильмов.
+
+    Каждая порция - отдельная транзакция, поэтому чтение и инкрементальные
+    обновления не ждут окончания пересчета: они работают с той же таблицей,
+    и обе стороны записывают актуальное состояние фильма. Строки удаленных
+    фильмов удаляются в конце. Возвращает число пересчитанных фильмов.
+    """
+    rows = 0
+    last_id = None
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(
+                "SELECT id FROM content.film_work "
+                "WHERE %s::uuid IS NULL OR id > %s::uuid ORDER BY id LIMIT %s;",
+                (last_id, last_id, batch_size),
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            refresh_for(cursor, "film_work", ids)
+            connection.commit()
+            rows += len(ids)
+            last_id = str(ids[-1])
+
+        cursor.execute(
+            f"DELETE FROM {READ_TABLE} r "
+            "WHERE NOT EXISTS (SELECT 1 FROM content.film_work fw WHERE fw.id = r.id);"
+        )
+        connection.commit()
+    return rows
@@ -0,0 +1,74 @@
+import threading
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import read_model
+from .cache import bump_content_version, filmwork_cache_key
+from .models import Filmwork, Genre, GenreFilmwork, Person, PersonFilmwork
+
+
+@receiver([post_save, post_delete], sender=Genre)
+@receiver([post_save, post_delete], sender=GenreFilmwork)
+def invalidate_genres(sender, **kwargs):
+    bump_content_version("genre")
+
+
+@receiver([post_save, post_delete], sender=Person)
+@receiver([post_save, post_delete], sender=PersonFilmwork)
+def invalidate_persons(sender, **kwargs):
+    bump_content_version("person")
+
+
+@receiver([post_save, post_delete], sender=Filmwork)
+def invalidate_filmwork(sender, instance, **kwargs):
+    # Новый updated_at и так дает новый ключ; удаляем запись на случай
+    # удаления фильма или сохранения без изменения updated_at
+    cache.delete(filmwork_cache_key(instance.pk, instance.updated_at))
+
+
+# Изменения, ожидающие пересчета модели чтения: таблица -> ключи (read_model.SOURCE_KEYS).
+# Сохранение фильма в админке с инлайнами дает десятки сигналов по одному фильму,
+# пересчет делается один раз после коммита
+_pending = threading.local()
+
+_READ_MODEL_TABLES = {
+    Filmwork: "film_work",
+    Genre: "genre",
+    Person: "person",
+    GenreFilmwork: "genre_film_work",
+    PersonFilmwork: "person_film_work",
+}
+
+
+def _schedule_refresh(table, key):
+    if not hasattr(_pending, "changes"):
+        _pending.changes = defaultdict(set)
+    _pending.changes[table].add(key)
+    # Каждый сигнал ставит свой обработчик: после отката транзакции
+    # накопленные ключи пересчитаются со следующим коммитом, это безопасно
+    transaction.on_commit(_flush_read_model)
+
+
+def _flush_read_model():
+    changes = _pending.__dict__.pop("changes", None)
+    if not changes:
+        return
+    with connection.cursor() as cursor:
+        for table, keys in changes.items():
+            read_model.refresh_for(cursor, table, keys)
+
+
+@receiver([post_save, post_delete], sender=Filmwork)
+@receiver([post_save, post_delete], sender=Genre)
+@receiver([post_save, post_delete], sender=Person)
+@receiver([post_save, post_delete], sender=GenreFilmwork)
+@receiver([post_save, post_delete], sender=PersonFilmwork)
+def refresh_read_model(sender, instance, **kwargs):
+    # Удаление жанра или человека сначала удаляет их связи, и затронутые
+    # фильмы находятся по сигналам связей
+    table = _READ_MODEL_TABLES[sender]
+    _schedule_refresh(table, getattr(instance, read_model.SOURCE_KEYS[table]))
@@ -0,0 +1,32 @@
+from django.db import connection
+from django.test import TransactionTestCase
+
+# Тесты используют локальный кеш процесса, а не Redis из окружения
+LOCAL_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+CONTENT_TABLES = (
+    "genre",
+    "person",
+    "film_work",
+    "genre_film_work",
+    "person_film_work",
+    "film_work_read",
+)
+
+
+def truncate_content():
+    names = ", ".join(f"content.{table}" for table in CONTENT_TABLES)
+    with connection.cursor() as cursor:
+        cursor.execute(f"TRUNCATE TABLE {names};")
+
+
+class ContentTransactionTestCase(TransactionTestCase):
+    """flush после теста не видит таблиц схемы content
+    (db_table 'content"."...'), поэтому они очищаются здесь"""
+
+    def setUp(self):
+        super().setUp()
+        truncate_content()
+        self.addCleanup(truncate_content)
@@ -0,0 +1,119 @@
+import uuid
+from unittest import mock
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from movies.auth import CustomBackend
+from movies.auth_client import AuthClient, AuthServiceUnavailable, CircuitBreaker
+from movies.tests import LOCAL_CACHES
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("movies.auth_client.time.monotonic", return_value=100.0)
+        self.monotonic = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(threshold=2, reset_timeout=5)
+
+    def test_opens_after_threshold(self):
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        self.assertTrue(self.breaker.allow())
+
+    def test_half_open_lets_one_probe_through(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        self.monotonic.return_value = 105.0
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+        self.assertTrue(self.breaker.allow())
+
+
+@override_settings(AUTH_API_BREAKER_THRESHOLD=2, AUTH_API_RETRIES=0)
+class AuthClientTests(SimpleTestCase):
+    def test_stops_calling_service_when_open(self):
+        client = AuthClient()
+        with mock.patch.object(
+            client.session, "post", side_effect=requests.ConnectionError
+        ) as post:
+            for _ in range(2):
+                with self.assertRaises(requests.ConnectionError):
+                    client.post(settings.AUTH_API_LOGIN_URL)
+            with self.assertRaises(AuthServiceUnavailable):
+                client.post(settings.AUTH_API_LOGIN_URL)
+
+        self.assertEqual(post.call_count, 2)
+
+
+def response(status_code, data=None):
+    return mock.Mock(status_code=status_code, json=mock.Mock(return_value=data))
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ProfileCacheTests(TestCase):
+    profile = {
+        "id": str(uuid.uuid4()),
+        "email": "ann@example.com",
+        "login": "ann",
+        "first_name": "Ann",
+        "last_name": "Smith",
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.client_mock = mock.Mock()
+        patcher = mock.patch("movies.auth.get_auth_client", return_value=self.client_mock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def answer(self, login_status=200):
+        def post(url, **kwargs):
+            if url == settings.AUTH_API_LOGIN_URL:
+                # Токен новый при каждом входе
+                return response(login_status, {"access_token": uuid.uuid4().hex})
+            return response(200, self.profile)
+
+        self.client_mock.post.side_effect = post
+
+    def profile_requests(self):
+        return [
+            call
+            for call in self.client_mock.post.call_args_list
+            if call.kwargs["url"] == settings.AUTH_API_ME_URL
+        ]
+
+    def test_profile_cached_by_login(self):
+        self.answer()
+        backend = CustomBackend()
+
+        first = backend.authenticate(None, username="ann", password="secret")
+        second = backend.authenticate(None, username="ann", password="secret")
+
+        self.assertEqual(str(first.id), self.profile["id"])
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(len(self.profile_requests()), 1)
+
+    def test_rejected_login_ignores_cached_profile(self):
+        self.answer()
+        CustomBackend().authenticate(None, username="ann", password="secret")
+
+        self.answer(login_status=401)
+        user = CustomBackend().authenticate(None, username="ann", password="wrong")
+
+        self.assertIsNone(user)
+        self.assertEqual(len(self.profile_requests()), 1)
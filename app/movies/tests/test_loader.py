@@ -0,0 +1,168 @@
+import os
+import tempfile
+
+import psycopg2
+from django.db import connection
+from django.test import override_settings
+from psycopg2.extras import DictCursor
+
+from benchmarks.synthetic import Catalogue, write_sqlite
+from config.db import loader_dsl
+from load_data import (
+    CheckpointStore,
+    ParallelLoader,
+    PostgresSaver,
+    conn_context,
+    load_from_sqlite,
+    plan_rowid_ranges,
+    transfer_table,
+)
+from movies.models import Filmwork, FilmworkRead, GenreFilmwork, Person, PersonFilmwork
+from movies.tests import LOCAL_CACHES, ContentTransactionTestCase
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class LoaderTests(ContentTransactionTestCase):
+    """Загрузчик пишет своим соединением psycopg2 с коммитами,
+    поэтому тесты идут без общей транзакции TestCase"""
+
+    catalogue = Catalogue(films=45, genres=3, persons=12, seed=7)
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.sqlite_path = os.path.join(tmp.name, "db.sqlite")
+        self.counts = write_sqlite(self.sqlite_path, self.catalogue)
+
+        self.dsl = {**loader_dsl(), "dbname": connection.settings_dict["NAME"]}
+        self.pg_conn = psycopg2.connect(**self.dsl, cursor_factory=DictCursor)
+        self.addCleanup(self.pg_conn.close)
+        self.addCleanup(self._drop_checkpoints)
+        CheckpointStore().ensure(self.pg_conn)
+
+    def _drop_checkpoints(self):
+        self.pg_conn.rollback()
+        with self.pg_conn.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS content.load_checkpoint;")
+        self.pg_conn.commit()
+
+    def load(self, **kwargs):
+        with conn_context(self.sqlite_path) as sqlite_conn:
+            load_from_sqlite(sqlite_conn, self.pg_conn, batch_size=10, **kwargs)
+
+    def assert_all_rows_loaded(self):
+        self.assertEqual(Filmwork.objects.count(), self.counts["film_work"])
+        self.assertEqual(Person.objects.count(), self.counts["person"])
+        self.assertEqual(GenreFilmwork.objects.count(), self.counts["genre_film_work"])
+        self.assertEqual(PersonFilmwork.objects.count(), self.counts["person_film_work"])
+
+    def failing_writer(self, after_batches):
+        """save_all, который падает на батче номер after_batches + 1"""
+        saver = PostgresSaver()
+        written = []
+
+        def write(pg_conn, columns, table, upsert=False):
+            if len(written) == after_batches:
+                raise RuntimeError("write failed")
+            saver.save_all(pg_conn, columns, table, upsert=upsert)
+            written.append(len(columns[0]))
+
+        return write
+
+    def test_load_fills_tables_and_read_model(self):
+        self.load()
+
+        self.assert_all_rows_loaded()
+        self.assertEqual(FilmworkRead.objects.count(), self.counts["film_work"])
+        for film in Filmwork.objects.all()[:5]:
+            self.assertEqual(
+                FilmworkRead.objects.get(pk=film.pk).serialize(), film.serialize()
+            )
+
+    def test_repeated_load_is_idempotent(self):
+        self.load()
+        for mode in ("insert", "copy"):
+            # Без контрольных точек все строки отправляются повторно
+            with self.pg_conn.cursor() as cursor:
+                cursor.execute("DELETE FROM content.load_checkpoint;")
+            self.pg_conn.commit()
+            self.load(mode=mode)
+
+        self.assert_all_rows_loaded()
+        self.assertEqual(FilmworkRead.objects.count(), self.counts["film_work"])
+
+    def test_bulk_load_skips_read_model(self):
+        self.load(refresh_read_model=False)
+
+        self.assert_all_rows_loaded()
+        self.assertEqual(FilmworkRead.objects.count(), 0)
+
+    def test_resume_after_failed_batch(self):
+        with conn_context(self.sqlite_path) as sqlite_conn:
+            with self.assertRaises(RuntimeError):
+                transfer_table(
+                    sqlite_conn, self.pg_conn, "film_work", self.failing_writer(2), 10
+                )
+            # Контрольная точка неудачного батча не закоммичена вместе с ним
+            self.pg_conn.rollback()
+            self.assertEqual(Filmwork.objects.count(), 20)
+            (start,) = CheckpointStore().range_starts(self.pg_conn, "film_work")
+            self.assertEqual(
+                CheckpointStore().get(self.pg_conn, "film_work", "rowid", start), (20, None)
+            )
+
+            rows = transfer_table(
+                sqlite_conn, self.pg_conn, "film_work", PostgresSaver().save_all, 10
+            )
+
+        self.assertEqual(rows, self.counts["film_work"] - 20)
+        self.assertEqual(Filmwork.objects.count(), self.counts["film_work"])
+
+    def test_parallel_ranges_resumed_sequentially(self):
+        with conn_context(self.sqlite_path) as sqlite_conn:
+            ranges = plan_rowid_ranges(sqlite_conn, self.pg_conn, "film_work", 3)
+            # Прерванный параллельный запуск успел перенести первый диапазон
+            done = transfer_table(
+                sqlite_conn,
+                self.pg_conn,
+                "film_work",
+                PostgresSaver().save_all,
+                10,
+                ranges[0],
+            )
+
+            rows = transfer_table(
+                sqlite_conn, self.pg_conn, "film_work", PostgresSaver().save_all, 10
+            )
+
+        self.assertEqual(rows, self.counts["film_work"] - done)
+        self.assertEqual(Filmwork.objects.count(), self.counts["film_work"])
+        self.assertEqual(
+            CheckpointStore().range_starts(self.pg_conn, "film_work"),
+            [start for start, _ in ranges],
+        )
+
+    def test_sequential_checkpoint_resumed_in_parallel(self):
+        with conn_context(self.sqlite_path) as sqlite_conn:
+            with self.assertRaises(RuntimeError):
+                transfer_table(
+                    sqlite_conn, self.pg_conn, "film_work", self.failing_writer(2), 10
+                )
+        self.pg_conn.rollback()
+        starts = CheckpointStore().range_starts(self.pg_conn, "film_work")
+
+        ParallelLoader(self.sqlite_path, self.dsl, workers=2, ranges=3, batch_size=10).run()
+
+        self.assert_all_rows_loaded()
+        # Диапазоны прошлого запуска, а не новое деление на три
+        self.assertEqual(CheckpointStore().range_starts(self.pg_conn, "film_work"), starts)
+
+    def test_truncate_clears_read_model_and_checkpoints(self):
+        self.load()
+
+        PostgresSaver().truncate_tables(self.pg_conn, ["film_work"])
+
+        self.assertEqual(Filmwork.objects.count(), 0)
+        self.assertEqual(FilmworkRead.objects.count(), 0)
+        self.assertEqual(CheckpointStore().range_starts(self.pg_conn, "film_work"), [])
@@ -0,0 +1,97 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+
+from movies.models import (
+    Filmwork,
+    FilmworkRead,
+    Genre,
+    GenreFilmwork,
+    Person,
+    PersonFilmwork,
+)
+from movies.tests import LOCAL_CACHES
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class LinkUniquenessTests(TestCase):
+    def setUp(self):
+        self.film = Filmwork.objects.create(title="Star")
+        self.person = Person.objects.create(full_name="Ann")
+        self.genre = Genre.objects.create(name="Drama")
+
+    def test_duplicate_genre_link_rejected(self):
+        GenreFilmwork.objects.create(film_work=self.film, genre=self.genre)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            GenreFilmwork.objects.create(film_work=self.film, genre=self.genre)
+
+    def test_duplicate_person_role_rejected(self):
+        PersonFilmwork.objects.create(film_work=self.film, person=self.person, role="actor")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            PersonFilmwork.objects.create(
+                film_work=self.film, person=self.person, role="actor"
+            )
+
+    def test_duplicate_roleless_person_link_rejected(self):
+        PersonFilmwork.objects.create(film_work=self.film, person=self.person, role=None)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            PersonFilmwork.objects.create(film_work=self.film, person=self.person, role=None)
+
+    def test_same_person_in_different_roles_allowed(self):
+        PersonFilmwork.objects.create(film_work=self.film, person=self.person, role="actor")
+        PersonFilmwork.objects.create(film_work=self.film, person=self.person, role=None)
+        self.assertEqual(self.film.personfilmwork_set.count(), 2)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ReadModelSignalTests(TestCase):
+    """Модель чтения пересчитывается после коммита изменений через ORM"""
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.film = Filmwork.objects.create(title="Star", rating=7.5)
+            self.genre = Genre.objects.create(name="Drama")
+            self.link = GenreFilmwork.objects.create(film_work=self.film, genre=self.genre)
+            ann = Person.objects.create(full_name="Ann")
+            bob = Person.objects.create(full_name="Bob")
+            PersonFilmwork.objects.create(film_work=self.film, person=ann, role="actor")
+            PersonFilmwork.objects.create(film_work=self.film, person=bob, role=None)
+
+    def read(self):
+        return FilmworkRead.objects.get(pk=self.film.pk)
+
+    def test_row_built_on_commit(self):
+        row = self.read()
+        self.assertEqual(row.title, "Star")
+        self.assertEqual(row.genres, ["Drama"])
+        self.assertEqual(row.persons, {"actor": ["Ann"], "": ["Bob"]})
+
+    def test_not_refreshed_before_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.genre.name = "Thriller"
+            self.genre.save()
+        self.assertEqual(self.read().genres, ["Drama"])
+        self.assertTrue(callbacks)
+
+    def test_genre_rename_refreshes_films(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.genre.name = "Thriller"
+            self.genre.save()
+        self.assertEqual(self.read().genres, ["Thriller"])
+
+    def test_link_delete_refreshes_film(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.link.delete()
+        self.assertEqual(self.read().genres, [])
+
+    def test_film_delete_removes_row(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.film.delete()
+        self.assertFalse(FilmworkRead.objects.filter(pk=self.film.pk).exists())
+
+    def test_serializers_agree(self):
+        expected = self.read().serialize()
+        self.assertEqual(Filmwork.objects.get(pk=self.film.pk).serialize(), expected)
+        self.assertEqual(
+            list(Filmwork.objects.filter(pk=self.film.pk).serialize()), [expected]
+        )
+        self.assertEqual(expected["persons"], {"": ["Bob"], "actor": ["Ann"]})
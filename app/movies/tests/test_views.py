@@ -0,0 +1,130 @@
+import datetime
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from movies.models import Filmwork, Genre, GenreFilmwork
+from movies.tests import LOCAL_CACHES, ContentTransactionTestCase
+
+
+@override_settings(CACHES=LOCAL_CACHES, INTERNAL_API_TOKEN="", CHANGE_FEED_LAG=10)
+class ChangeFeedTests(TestCase):
+    url = reverse("filmworks-changes")
+
+    def changes(self, since):
+        return self.client.get(self.url, {"since": since.isoformat()})
+
+    def test_invalid_since_rejected(self):
+        for since in ("2024-01-01T00:00:00", "2024-13-01T00:00:00+00:00", "junk"):
+            with self.subTest(since=since):
+                response = self.client.get(self.url, {"since": since})
+                self.assertEqual(response.status_code, 400)
+
+    def test_until_lags_behind_now(self):
+        since = timezone.now() - datetime.timedelta(hours=1)
+
+        data = self.changes(since).json()
+
+        until = datetime.datetime.fromisoformat(data["until"])
+        self.assertLessEqual(until, timezone.now() - datetime.timedelta(seconds=10))
+        self.assertEqual(datetime.datetime.fromisoformat(data["since"]), since)
+
+    def test_future_since_is_not_moved_back(self):
+        since = timezone.now() + datetime.timedelta(minutes=1)
+
+        data = self.changes(since).json()
+
+        self.assertEqual(data["until"], since.isoformat())
+        self.assertEqual(data["film_work_ids"], [])
+
+    @override_settings(CHANGE_FEED_LAG=0)
+    def test_reports_changed_films(self):
+        Filmwork.objects.create(title="Old")
+        since = timezone.now()
+        film = Filmwork.objects.create(title="Star")
+
+        data = self.changes(since).json()
+
+        self.assertEqual(data["film_work_ids"], [str(film.pk)])
+
+
+@override_settings(CACHES=LOCAL_CACHES, INTERNAL_API_TOKEN="", CHANGE_FEED_LAG=0)
+class ExportTests(ContentTransactionTestCase):
+    """refreshed_at - время коммита пересчета модели чтения,
+    поэтому нужны настоящие коммиты, а не общая транзакция TestCase"""
+
+    url = reverse("filmworks-export")
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        body = b"".join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_invalid_watermark_rejected(self):
+        for watermark in ("2024-01-01T00:00:00", "2024-13-01T00:00:00+00:00", "junk"):
+            with self.subTest(updated_after=watermark):
+                response = self.client.get(self.url, {"updated_after": watermark})
+                self.assertEqual(response.status_code, 400)
+
+    def test_link_change_moves_film_past_watermark(self):
+        film = Filmwork.objects.create(title="Star")
+        (row,) = self.export()
+        watermark = row["refreshed_at"]
+        parse = datetime.datetime.fromisoformat
+        self.assertEqual(self.export(updated_after=watermark), [])
+
+        genre = Genre.objects.create(name="Drama")
+        GenreFilmwork.objects.create(film_work=film, genre=genre)
+
+        (row,) = self.export(updated_after=watermark)
+        self.assertEqual(row["id"], str(film.pk))
+        self.assertEqual(row["genres"], ["Drama"])
+        # Сам фильм не менялся: по updated_at изменение было бы пропущено
+        self.assertLessEqual(parse(row["updated_at"]), parse(watermark))
+
+    def test_rows_newer_than_lag_held_back(self):
+        Filmwork.objects.create(title="Star")
+
+        with self.settings(CHANGE_FEED_LAG=60):
+            self.assertEqual(self.export(), [])
+
+
+@override_settings(
+    CACHES=LOCAL_CACHES, INTERNAL_API_TOKEN="", CHANGE_FEED_LAG=0, SERVER_MODE="asgi"
+)
+class AsgiExportTests(ContentTransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.film = Filmwork.objects.create(title="Star")
+
+    async def test_export_streams_asynchronously(self):
+        response = await self.async_client.get(reverse("filmworks-export"))
+
+        # Синхронный итератор Django под ASGI собрал бы в память целиком
+        self.assertTrue(response.is_async)
+        lines = [line async for line in response.streaming_content]
+        self.assertEqual([json.loads(line)["id"] for line in lines], [str(self.film.pk)])
+
+
+@override_settings(CACHES=LOCAL_CACHES, INTERNAL_API_TOKEN="secret")
+class InternalApiTests(TestCase):
+    urls = ["/api/v1/health/db", "/metrics"]
+
+    def test_token_required(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 401)
+                response = self.client.get(url, HTTP_AUTHORIZATION="Bearer wrong")
+                self.assertEqual(response.status_code, 401)
+
+    def test_token_accepted(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_AUTHORIZATION="Bearer secret")
+                self.assertEqual(response.status_code, 200)
+
+    def test_public_routes_need_no_token(self):
+        self.assertEqual(self.client.get(reverse("genres")).status_code, 200)
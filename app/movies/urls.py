@@ -0,0 +1,17 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("filmworks/export", views.export_filmworks, name="filmworks-export"),
+    path("filmworks/changes", views.filmwork_changes, name="filmworks-changes"),
+    path("search", views.search, name="search"),
+    path("genres", views.genres, name="genres"),
+    path(
+        "filmworks/<uuid:film_work_id>",
+        views.filmwork_detail,
+        name="filmworks-detail",
+    ),
+    path("health/db", views.db_health, name="health-db"),
+    path("auth/login", views.login, name="login"),
+]
@@ -1,3 +1,197 @@
-from django.shortcuts import render
+import json
+import time
 
-# Create your views here.
+from django.conf import settings
+from django.contrib.auth import alogin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET, require_POST
+
+from . import metrics as request_metrics
+from .auth import CustomBackend
+from .cache import acached_filmwork, acached_genres
+from .db import connection_stats
+from .decorators import internal_api
+from .models import Filmwork, FilmworkRead, Person, change_feed_until
+
+EXPORT_CHUNK_SIZE = 2000
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+
+def _ndjson_line(film):
+    item = film.serialize()
+    # isoformat() сам, без DjangoJSONEncoder: тот обрезает время до
+    # миллисекунд, и водяной знак из последней строки был бы раньше нее
+    item["updated_at"] = film.updated_at.isoformat()
+    item["refreshed_at"] = film.refreshed_at.isoformat()
+    return json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def _ndjson(films):
+    for film in films:
+        yield _ndjson_line(film)
+
+
+async def _andjson(films):
+    async for film in films:
+        yield _ndjson_line(film)
+
+
+@internal_api
+@require_GET
+def export_filmworks(request):
+    """Все кинопроизведения в NDJSON, по одной строке на фильм.
+
+    ?updated_after=<ISO 8601> отдает только фильмы, измененные позже
+    этой отметки, включая изменения их жанров, людей и связей. Строки идут
+    по возрастанию refreshed_at (момент последнего изменения строки модели
+    чтения), поэтому refreshed_at последней строки - водяной знак для
+    следующего запроса. Строки моложе CHANGE_FEED_LAG секунд не отдаются,
+    чтобы водяной знак не обогнал незакоммиченные изменения.
+
+    Фильмы читаются из модели чтения FilmworkRead: жанры и люди уже
+    собраны в строке фильма, подзапросы по связям не нужны.
+    """
+    films = FilmworkRead.objects.filter(refreshed_at__lte=change_feed_until()).order_by(
+        "refreshed_at", "id"
+    )
+    updated_after = request.GET.get("updated_after")
+    if updated_after:
+        try:
+            watermark = parse_datetime(updated_after)
+        except ValueError:
+            watermark = None
+        if watermark is None or timezone.is_naive(watermark):
+            return HttpResponseBadRequest(
+                "updated_after must be an ISO 8601 datetime with a time zone"
+            )
+        films = films.filter(refreshed_at__gt=watermark)
+
+    # iterator() читает через серверный курсор порциями по EXPORT_CHUNK_SIZE,
+    # поэтому память не растет с размером каталога. Под ASGI синхронный
+    # итератор Django собрал бы в список целиком, там нужен асинхронный
+    if settings.SERVER_MODE == "asgi":
+        lines = _andjson(films.aiterator(chunk_size=EXPORT_CHUNK_SIZE))
+    else:
+        lines = _ndjson(films.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+    return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+
+@internal_api
+@require_GET
+async def filmwork_changes(request):
+    """id фильмов, затронутых изменениями после ?since=<ISO 8601>.
+
+    until в ответе - верхняя граница выборки, ее нужно передать
+    как since в следующем запросе. Она отстает от текущего времени
+    на CHANGE_FEED_LAG секунд, чтобы не обогнать незакоммиченные записи.
+    """
+    try:
+        # None - не похоже на дату, ValueError - похоже, но такой даты нет
+        since = parse_datetime(request.GET.get("since", ""))
+    except ValueError:
+        since = None
+    if since is None or timezone.is_naive(since):
+        return HttpResponseBadRequest("since must be an ISO 8601 datetime with a time zone")
+    # since позже границы - изменений еще нет, водяной знак не сдвигается назад
+    until = max(change_feed_until(), since)
+    ids = Filmwork.objects.changed_ids(since, until)
+    return JsonResponse(
+        {
+            # Без обрезки до миллисекунд: until - следующий since
+            "since": since.isoformat(),
+            "until": until.isoformat(),
+            "film_work_ids": [str(film_work_id) async for film_work_id in ids],
+        }
+    )
+
+
+@require_GET
+async def search(request):
+    """Полнотекстовый поиск фильмов и людей по ?q=, лучшие совпадения первыми"""
+    text = request.GET.get("q", "").strip()
+    if not text:
+        return HttpResponseBadRequest("q is required")
+    try:
+        limit = int(request.GET.get("limit", SEARCH_LIMIT))
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    except ValueError:
+        return HttpResponseBadRequest("limit must be an integer")
+
+    films = Filmwork.objects.search(text).values("id", "title", "type", "rank")
+    persons = Person.objects.search(text).values("id", "full_name", "rank")
+    return JsonResponse(
+        {
+            "filmworks": [film async for film in films[:limit]],
+            "persons": [person async for person in persons[:limit]],
+        }
+    )
+
+
+@require_GET
+async def genres(request):
+    """Справочник жанров; отдается из кеша до изменения любого жанра"""
+    return JsonResponse({"genres": await acached_genres()})
+
+
+@require_GET
+async def filmwork_detail(request, film_work_id):
+    """Карточка фильма с жанрами и участниками, закешированная по updated_at"""
+    try:
+        film = await acached_filmwork(film_work_id)
+    except Filmwork.DoesNotExist:
+        raise Http404("Film work not found")
+    return JsonResponse(film)
+
+
+@internal_api
+@require_GET
+def db_health(request):
+    """Проверка БД: время SELECT 1 и статистика соединений процесса"""
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return JsonResponse(
+        {
+            "select_ms": round((time.perf_counter() - started) * 1000, 3),
+            **connection_stats(),
+        }
+    )
+
+
+@require_POST
+async def login(request):
+    """Вход через сервис авторизации: username и password в теле формы.
+
+    Под ASGI ожидание сервиса авторизации не занимает поток,
+    в отличие от формы входа админки.
+    """
+    username = request.POST.get("username")
+    password = request.POST.get("password")
+    if not username or not password:
+        return HttpResponseBadRequest("username and password are required")
+    user = await CustomBackend().aauthenticate(
+        request, username=username, password=password
+    )
+    if user is None:
+        return JsonResponse({"detail": "Invalid credentials"}, status=401)
+    await alogin(request, user, backend="movies.auth.CustomBackend")
+    return JsonResponse({"id": str(user.id), "username": user.username})
+
+
+@internal_api
+@require_GET
+def metrics(request):
+    """Метрики запросов в формате Prometheus, сумма по всем процессам"""
+    body, content_type = request_metrics.render()
+    return HttpResponse(body, content_type=content_type)
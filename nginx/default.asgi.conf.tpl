@@ -0,0 +1,29 @@
+server {
+    listen ${LISTEN_PORT};
+
+    location /static {
+        alias /vol/static;
+    }
+
+    # Служебные маршруты - метрики, проверка БД, выгрузка и лента изменений -
+    # доступны только из сетей INTERNAL_NETWORKS (список allow генерирует run.sh)
+    location ~ ^/(metrics|api/v1/health/.*|api/v1/filmworks/(export|changes))$ {
+        include     /etc/nginx/conf.d/internal_networks;
+        proxy_pass          http://${APP_HOST}:${APP_PORT};
+        proxy_http_version  1.1;
+        proxy_set_header    Connection "";
+        proxy_set_header    Host $host;
+        proxy_set_header    X-Forwarded-For $proxy_add_x_forwarded_for;
+        proxy_set_header    X-Forwarded-Proto $scheme;
+    }
+
+    location / {
+        proxy_pass          http://${APP_HOST}:${APP_PORT};
+        proxy_http_version  1.1;
+        proxy_set_header    Connection "";
+        proxy_set_header    Host $host;
+        proxy_set_header    X-Forwarded-For $proxy_add_x_forwarded_for;
+        proxy_set_header    X-Forwarded-Proto $scheme;
+        client_max_body_size 100M;
+    }
+}
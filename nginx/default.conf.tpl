@@ -5,6 +5,14 @@ server {
         alias /vol/static;
     }
 
+    # Служебные маршруты - метрики, проверка БД, выгрузка и лента изменений -
+    # доступны только из сетей INTERNAL_NETWORKS (список allow генерирует run.sh)
+    location ~ ^/(metrics|api/v1/health/.*|api/v1/filmworks/(export|changes))$ {
+        include     /etc/nginx/conf.d/internal_networks;
+        uwsgi_pass  ${APP_HOST}:${APP_PORT};
+        include     /etc/nginx/uwsgi_params;
+    }
+
     location / {
         uwsgi_pass  ${APP_HOST}:${APP_PORT};
         include     /etc/nginx/uwsgi_params;
@@ -2,5 +2,20 @@
 
 set -e
 
-envsubst < /etc/nginx/default.conf.tpl > /etc/nginx/conf.d/default.conf
-nginx -g 'daemon off;'
\ No newline at end of file
+# APP_PROTOCOL=http - приложение запущено под uvicorn (SERVER_MODE=asgi)
+if [ "$APP_PROTOCOL" = "http" ]; then
+    TEMPLATE=/etc/nginx/default.asgi.conf.tpl
+else
+    TEMPLATE=/etc/nginx/default.conf.tpl
+fi
+
+# allow для служебных маршрутов: по одной строке на сеть из INTERNAL_NETWORKS
+: > /etc/nginx/conf.d/internal_networks
+for network in $INTERNAL_NETWORKS; do
+    echo "allow $network;" >> /etc/nginx/conf.d/internal_networks
+done
+echo "deny all;" >> /etc/nginx/conf.d/internal_networks
+
+# Перечисляем переменные явно, чтобы envsubst не трогал $host и другие переменные nginx
+envsubst '${LISTEN_PORT} ${APP_HOST} ${APP_PORT}' < "$TEMPLATE" > /etc/nginx/conf.d/default.conf
+nginx -g 'daemon off;'
@@ -0,0 +1,34 @@
+#!/bin/sh
+
+# Пропускная способность uWSGI при разных настройках процессов и потоков.
+# Запуск из каталога app при доступной БД:
+#     sh ../scripts/bench_uwsgi.sh "2:1:0 2:4:0 4:4:0 4:4:1 8:4:0" search
+# Профиль - WEB_CONCURRENCY:WEB_THREADS:WEB_LAZY_APPS, сценарий - из benchmarks.load_test.
+# Для сценария login запустите python -m benchmarks.slow_auth и AUTH_API=http://127.0.0.1:8081.
+
+set -e
+
+PROFILES=${1:-"2:1:0 2:4:0 4:4:0 4:4:1 8:4:0"}
+SCENARIO=${2:-search}
+CONCURRENCY=${CONCURRENCY:-64}
+REQUESTS=${REQUESTS:-5000}
+
+for profile in $PROFILES; do
+    IFS=: read -r procs threads lazy <<EOT
+$profile
+EOT
+    WEB_CONCURRENCY=$procs WEB_THREADS=$threads WEB_LAZY_APPS=$lazy \
+    WEB_SOCKET=127.0.0.1:8000 WEB_PROTOCOL=http \
+        sh -c '. "$1/uwsgi_env.sh"; exec uwsgi --ini uwsgi.ini --pidfile /tmp/bench_uwsgi.pid --daemonize /tmp/bench_uwsgi.log' \
+        sh "$(dirname "$0")"
+    sleep 3
+
+    echo "== processes=$procs threads=$threads lazy-apps=$lazy"
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --scenario "$SCENARIO" \
+        --concurrency "$CONCURRENCY" --requests "$REQUESTS"
+    # Суммарная память всех процессов uWSGI после прогона
+    ps -C uwsgi -o rss= | awk '{ total += $1 } END { printf "RSS: %.0f МБ\n", total / 1024 }'
+
+    uwsgi --stop /tmp/bench_uwsgi.pid
+    sleep 2
+done
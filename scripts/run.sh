@@ -5,6 +5,21 @@ set -e
 python manage.py wait_for_db
 python manage.py migrate
 python manage.py collectstatic --no-input
-python load_data.py
+python load_data.py --workers 4 --ranges 4
 
-uwsgi --socket :9000 --workers 4 --master --enable-threads --module config.wsgi
\ No newline at end of file
+# Метрики /metrics суммируются по всем процессам через общий каталог;
+# значения прошлого запуска удаляем
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# SERVER_MODE=asgi - uvicorn (асинхронные view и вход без блокировки воркера),
+# иначе uWSGI; nginx должен проксировать соответствующим протоколом (APP_PROTOCOL)
+if [ "$SERVER_MODE" = "asgi" ]; then
+    exec uvicorn config.asgi:application --host 0.0.0.0 --port 9000 \
+        --workers "${ASGI_WORKERS:-2}" --lifespan off --no-access-log
+fi
+
+# Процессы, потоки, cheaper и остальное - переменные WEB_*, см. scripts/uwsgi_env.sh
+. "$(dirname "$0")/uwsgi_env.sh"
+exec uwsgi --ini uwsgi.ini
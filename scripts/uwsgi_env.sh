@@ -0,0 +1,47 @@
+#!/bin/sh
+
+# Значения по умолчанию для app/uwsgi.ini; заданные переменные окружения не меняются.
+# Подключается через ". scripts/uwsgi_env.sh" или из run.sh.
+
+# Доступные ядра: квота CPU контейнера (cgroup v2 и v1), иначе nproc
+cpu_count() {
+    if [ -r /sys/fs/cgroup/cpu.max ]; then
+        read -r quota period < /sys/fs/cgroup/cpu.max
+    elif [ -r /sys/fs/cgroup/cpu/cpu.cfs_quota_us ]; then
+        quota=$(cat /sys/fs/cgroup/cpu/cpu.cfs_quota_us)
+        period=$(cat /sys/fs/cgroup/cpu/cpu.cfs_period_us)
+    fi
+    if [ -n "$quota" ] && [ "$quota" != "max" ] && [ "$quota" -gt 0 ]; then
+        # округляем вверх, минимум одно ядро
+        echo $(( (quota + period - 1) / period ))
+    else
+        nproc
+    fi
+}
+
+CPUS=$(cpu_count)
+
+# Запросы админки в основном ждут БД и сервис авторизации, поэтому
+# процессов по два на ядро и по 4 потока в каждом
+: "${WEB_CONCURRENCY:=$((CPUS * 2))}"
+: "${WEB_THREADS:=4}"
+: "${WEB_SOCKET:=:9000}"
+: "${WEB_PROTOCOL:=uwsgi}"
+: "${WEB_LISTEN:=128}"
+: "${WEB_LAZY_APPS:=0}"
+: "${WEB_MAX_REQUESTS:=1000}"
+: "${WEB_RELOAD_ON_RSS:=512}"
+: "${WEB_HARAKIRI:=60}"
+: "${WEB_OFFLOAD_THREADS:=2}"
+
+# cheaper включается, только если задан и меньше числа процессов
+if [ -n "$WEB_CHEAPER" ]; then
+    if [ "$WEB_CHEAPER" -lt "$WEB_CONCURRENCY" ]; then
+        export WEB_CHEAPER
+    else
+        unset WEB_CHEAPER
+    fi
+fi
+
+export WEB_CONCURRENCY WEB_THREADS WEB_SOCKET WEB_PROTOCOL WEB_LISTEN WEB_LAZY_APPS \
+    WEB_MAX_REQUESTS WEB_RELOAD_ON_RSS WEB_HARAKIRI WEB_OFFLOAD_THREADS